@@ -0,0 +1,29 @@
+"""portfolio series analytics
+
+Revision ID: 4f1c8a2d6e57
+Revises: 9d4e2b7c1a30
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c8a2d6e57'
+down_revision: Union[str, None] = '9d4e2b7c1a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('portfolio_series', sa.Column('analytics', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('portfolio_series', 'analytics')
@@ -0,0 +1,39 @@
+"""materialized portfolio series
+
+Revision ID: 9d4e2b7c1a30
+Revises: 20c71308b4b7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e2b7c1a30'
+down_revision: Union[str, None] = '20c71308b4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('portfolio_series',
+    sa.Column('portfolio_id', sa.UUID(), nullable=False),
+    sa.Column('orders_digest', sa.String(length=64), nullable=False),
+    sa.Column('price_version', sa.String(length=64), nullable=False),
+    sa.Column('as_of', sa.Date(), nullable=False),
+    sa.Column('series', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('allocations', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('state', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['portfolio_id'], ['portfolios.id'], ),
+    sa.PrimaryKeyConstraint('portfolio_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('portfolio_series')
@@ -0,0 +1,37 @@
+"""position checkpoints
+
+Revision ID: b7e3d91f0c42
+Revises: 4f1c8a2d6e57
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d91f0c42'
+down_revision: Union[str, None] = '4f1c8a2d6e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('position_checkpoints',
+    sa.Column('portfolio_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('holdings', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('invested', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['portfolio_id'], ['portfolios.id'], ),
+    sa.PrimaryKeyConstraint('portfolio_id', 'date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('position_checkpoints')
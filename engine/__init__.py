@@ -0,0 +1,24 @@
+from prices import Prices
+
+from .analytics import (analyze, analyze_series, cash_flows,
+                        summary_statistics)
+from .backtest import Backtester
+from .benchmark import BenchmarkCache
+from .checkpoints import PositionCheckpoints
+from .dca import DcaEngine
+from .executor import ComputeBusy, ComputeExecutor
+from .ledger import PositionLedger
+from .materialized import MaterializedSeries
+from .orders import parse_orders, validate_orders
+from .replay import ReplayEngine, summarize
+from .resample import downsample_frame, downsample_series, parse_resolution
+from .serialize import RawJSON, series_json
+from .trades import parse_trades, read_trades_csv
+
+Replay: ReplayEngine = ReplayEngine(Prices)
+DCA: DcaEngine = DcaEngine(Prices)
+Materialized: MaterializedSeries = MaterializedSeries(Replay)
+Benchmarks: BenchmarkCache = BenchmarkCache(Prices)
+Compute: ComputeExecutor = ComputeExecutor(Prices)
+Checkpoints: PositionCheckpoints = PositionCheckpoints(Prices)
+Backtests: Backtester = Backtester(Prices)
@@ -0,0 +1,200 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# The fields of analyze that hold a value per day rather than one number
+SERIES_FIELDS = ("returns", "rolling")
+
+
+def cash_flows(orders: pd.DataFrame, days: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Sums the money put into or taken out of a portfolio on each day.
+
+    Each order counts on the first day of the series on or after its date, the
+    day the replay adds it to (or subtracts it from) the portfolio value.
+
+    Args:
+        orders: The orders, as parse_orders returns them
+        days: The days of the value series
+
+    Returns:
+        A float64 array with the net flow of each day: buys are positive, sells
+        negative.
+    """
+    amounts = (orders["Shares"] * orders["Price_Per_Share"]).to_numpy(dtype=np.float64)
+    amounts = np.where(orders["Order_Type"].to_numpy() == "sell", -amounts, amounts)
+    rows = days.searchsorted(orders["Date"].to_numpy())
+    inside = rows < len(days)
+    return np.bincount(rows[inside], weights=amounts[inside], minlength=len(days))
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    totals = np.concatenate([[0.0], np.cumsum(values)])
+    return totals[window:] - totals[:-window]
+
+
+def _dated(days: List[str], values: np.ndarray) -> Dict[str, float | None]:
+    return {
+        day: None if np.isnan(value) else float(value) for day, value in zip(days, values)
+    }
+
+
+def _ratio(excess: float, deviation: float) -> float | None:
+    if not deviation > 0:
+        return None
+    return float(excess / deviation * np.sqrt(TRADING_DAYS))
+
+
+def _returns(series: Dict[str, float], flows: np.ndarray | None) -> tuple:
+    # The sorted days and the time-weighted return of each day after the first
+    days = sorted(series)
+    if len(days) < 2:
+        raise ValueError("At least two days of values are needed for analytics")
+
+    values = np.array([series[day] for day in days], dtype=np.float64)
+    if flows is None:
+        flows = np.zeros(len(values))
+
+    # The return of each day after the first, 0 when nothing was held before it
+    previous = values[:-1]
+    returns = np.divide(
+        values[1:] - flows[1:],
+        previous,
+        out=np.ones(len(previous)),
+        where=previous > 0,
+    ) - 1.0
+    return days, returns
+
+
+def _rolling(days_returned: List[str], returns: np.ndarray, windows: Sequence[int]) -> dict:
+    rolling = {}
+    logs = np.log1p(returns)
+    for window in windows:
+        if window < 2 or window > len(returns):
+            continue
+        mean = _rolling_sum(returns, window) / window
+        variance = (_rolling_sum(returns**2, window) - window * mean**2) / (window - 1)
+        rolling[str(window)] = {
+            "return": _dated(
+                days_returned[window - 1 :],
+                np.expm1(_rolling_sum(logs, window) * TRADING_DAYS / window),
+            ),
+            "volatility": _dated(
+                days_returned[window - 1 :],
+                np.sqrt(np.maximum(variance, 0.0) * TRADING_DAYS),
+            ),
+        }
+    return rolling
+
+
+def analyze(
+    series: Dict[str, float],
+    flows: np.ndarray | None = None,
+    risk_free_rate: float = 0.0,
+    windows: Sequence[int] = (21, 63, 252),
+) -> dict:
+    """
+    Computes the risk and performance statistics of a daily value series.
+
+    Returns are time-weighted: the flows of a day are taken out of its value
+    before comparing it with the previous day's, so deposits and withdrawals
+    do not count as gains or losses. Drawdowns are measured on the growth of
+    $1 compounded at those returns.
+
+    Args:
+        series: The daily portfolio value keyed by 'YYYY-MM-DD' trading day
+        flows: The net cash flow of each day, see cash_flows, or None
+        risk_free_rate: The annual risk-free rate, e.g. 0.04
+        windows: The lengths in trading days of the rolling statistics
+
+    Returns:
+        A dict with the daily 'returns', the 'total_return',
+        'annualized_return' and 'annualized_volatility', the 'max_drawdown'
+        with its 'peak', 'trough' and 'recovery' dates, the 'sharpe' and
+        'sortino' ratios, and per window the 'rolling' annualized 'return' and
+        'volatility' keyed by the last day of each window. Undefined values are
+        None.
+
+    Raises:
+        ValueError: If the series has fewer than two days.
+    """
+    days, returns = _returns(series, flows)
+    days_returned = days[1:]
+    periods = len(returns)
+
+    growth = np.cumprod(1.0 + returns)
+    total_return = growth[-1] - 1.0
+    annualized_return = (
+        growth[-1] ** (TRADING_DAYS / periods) - 1.0 if growth[-1] > 0 else -1.0
+    )
+    volatility = returns.std(ddof=1) if periods > 1 else np.nan
+
+    # Drawdown from the running peak of the growth of $1, which starts at 1
+    wealth = np.concatenate([[1.0], growth])
+    peaks = np.maximum.accumulate(wealth)
+    drawdowns = wealth / peaks - 1.0
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(wealth[: trough + 1]))
+    recovered = np.flatnonzero(wealth[trough:] >= wealth[peak])
+    max_drawdown = {
+        "drawdown": float(drawdowns[trough]),
+        "peak": days[peak],
+        "trough": days[trough],
+        "recovery": days[trough + recovered[0]] if len(recovered) else None,
+    }
+
+    daily_rate = (1.0 + risk_free_rate) ** (1.0 / TRADING_DAYS) - 1.0
+    excess = returns - daily_rate
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))
+
+    return {
+        "returns": _dated(days_returned, returns),
+        "total_return": float(total_return),
+        "annualized_return": float(annualized_return),
+        "annualized_volatility": (
+            None if np.isnan(volatility) else float(volatility * np.sqrt(TRADING_DAYS))
+        ),
+        "max_drawdown": max_drawdown,
+        "sharpe": _ratio(excess.mean(), volatility),
+        "sortino": _ratio(excess.mean(), downside),
+        "rolling": _rolling(days_returned, returns, windows),
+    }
+
+
+def summary_statistics(statistics: dict) -> dict:
+    """
+    Args:
+        statistics: The statistics analyze returns
+
+    Returns: The statistics without their per-day fields, SERIES_FIELDS.
+    """
+    return {field: value for field, value in statistics.items() if field not in SERIES_FIELDS}
+
+
+def analyze_series(
+    series: Dict[str, float],
+    flows: np.ndarray | None = None,
+    windows: Sequence[int] = (21, 63, 252),
+) -> dict:
+    """
+    Computes only the per-day statistics of analyze, for a stored summary.
+
+    Args:
+        series: The daily portfolio value keyed by 'YYYY-MM-DD' trading day
+        flows: The net cash flow of each day, see cash_flows, or None
+        windows: The lengths in trading days of the rolling statistics
+
+    Returns:
+        A dict with the 'returns' and 'rolling' of analyze.
+
+    Raises:
+        ValueError: If the series has fewer than two days.
+    """
+    days, returns = _returns(series, flows)
+    return {
+        "returns": _dated(days[1:], returns),
+        "rolling": _rolling(days[1:], returns, windows),
+    }
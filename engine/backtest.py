@@ -0,0 +1,223 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .analytics import analyze
+
+REBALANCES = ("never", "monthly", "quarterly", "threshold")
+
+
+class Backtester:
+    """
+    Backtests holding target weights of some tickers over the aligned price matrix.
+
+    Money goes in on the first day and on the first trading day of every
+    month, split by the target weights. On rebalance days every position is
+    traded back to its target weight: each month, each quarter, or on any day
+    a weight drifts further than a threshold from its target. Trades pay a
+    cost proportional to their amount.
+
+    Shares only change on those days, so each stretch between them is valued
+    with one matrix product, and with a threshold the first day the drift is
+    exceeded is found over the whole stretch at once.
+
+    Results are kept in a small LRU cache keyed by a hash of the allocations,
+    parameters and price data version.
+    """
+
+    max_results = 128
+
+    def __init__(self, store):
+        self.store = store
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, allocations: Dict[str, float], **params) -> str:
+        """
+        Args:
+            allocations: A dict mapping tickers to allocation percentages
+            **params: The other arguments of run
+
+        Returns: The cache key of a backtest.
+        """
+        payload = {
+            "allocations": allocations,
+            "params": params,
+            "version": self.store.version,
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """
+        Args:
+            key: The cache key of a backtest
+
+        Returns: The cached result, or None.
+        """
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, key: str, result: dict):
+        """
+        Caches the result of a backtest, evicting the least recently used.
+
+        Args:
+            key: The cache key of the backtest
+            result: Its result
+        """
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def run(
+        self,
+        allocations: Dict[str, float],
+        start_date: date,
+        end_date: date,
+        monthly_savings: float = 0.0,
+        initial: float = 0.0,
+        rebalance: str = "monthly",
+        threshold: float = 0.05,
+        cost_bps: float = 0.0,
+    ) -> dict:
+        """
+        Backtests a target allocation.
+
+        Args:
+            allocations: A dict mapping tickers to allocation percentages
+            start_date: The first day, which gets the initial amount and the
+                first monthly amount
+            end_date: The last day
+            monthly_savings: The amount invested each month
+            initial: The amount invested on the first day
+            rebalance: 'never', 'monthly', 'quarterly' or 'threshold'
+            threshold: With 'threshold', how far a weight may drift from its
+                target, e.g. 0.05 for 5 percentage points
+            cost_bps: The cost of a trade in basis points of its amount
+
+        Returns:
+            A dict with the 'series' DataFrame of the daily 'portfolio_value'
+            indexed by 'YYYY-MM-DD' trading day, the number of 'rebalances',
+            the 'invested' amount, the 'turnover' (all money traded, buying
+            with contributions included), the trading 'costs' (cost_bps of
+            the turnover), the final 'weights' and the 'statistics' of the
+            series as analyze computes them.
+
+        Raises:
+            ValueError: If a parameter is invalid, a ticker is unknown or has
+                no price on the first day.
+        """
+        if rebalance not in REBALANCES:
+            raise ValueError(
+                f"Unknown rebalance {rebalance}, expected one of {', '.join(REBALANCES)}"
+            )
+        if not allocations or any(weight < 0 for weight in allocations.values()):
+            raise ValueError("Allocations must be non-negative percentages")
+        total = sum(allocations.values())
+        if total <= 0:
+            raise ValueError("Allocations must add up to more than 0")
+        if monthly_savings < 0 or initial < 0 or monthly_savings + initial <= 0:
+            raise ValueError("Nothing to invest, set monthly_savings or initial")
+
+        tickers = list(allocations)
+        targets = np.array([allocations[ticker] / total for ticker in tickers])
+        rate = cost_bps / 10000
+        self.store.manifest.validate(tickers)
+
+        matrix = self.store.matrix()
+        lo, hi = matrix.rows(start_date, end_date)
+        if hi <= lo:
+            raise ValueError("No trading days between the start and end dates")
+        dates = matrix.dates[lo:hi]
+        columns = [matrix.column(ticker) for ticker in tickers]
+        # A ticker without a close on a day is valued at its previous close
+        prices = pd.DataFrame(matrix.closes[:hi, columns]).ffill().to_numpy()[lo:]
+        for ticker, price in zip(tickers, prices[0]):
+            if np.isnan(price):
+                raise ValueError(f"No price data for ticker {ticker} on {dates[0]:%Y-%m-%d}")
+        days = len(dates)
+
+        # The first trading day of each month, and of each quarter
+        months = dates.to_numpy().astype("datetime64[M]").astype(np.int64)
+        month_starts = np.append([0], np.flatnonzero(months[1:] != months[:-1]) + 1)
+        contributions = np.zeros(days)
+        contributions[0] += initial
+        contributions[month_starts] += monthly_savings
+        scheduled = np.zeros(days, dtype=bool)
+        if rebalance == "monthly":
+            scheduled[month_starts] = True
+        elif rebalance == "quarterly":
+            scheduled[month_starts[months[month_starts] % 3 == 0]] = True
+        events = np.flatnonzero(scheduled | (contributions > 0))
+
+        shares = np.zeros(len(tickers))
+        values = np.empty(days)
+        rebalances, costs, turnover = 0, 0.0, 0.0
+        row = 0
+        while row < days:
+            holdings = shares * prices[row]
+            value, amount = holdings.sum(), contributions[row]
+            drifted = rebalance == "threshold" and (
+                value > 0 and np.abs(holdings / value - targets).max() > threshold
+            )
+            if (scheduled[row] or drifted) and value > 0:
+                trades = targets * (value + amount) - holdings
+                cost = rate * np.abs(trades).sum()
+                shares = targets * (value + amount - cost) / prices[row]
+                rebalances += 1
+                costs += cost
+                turnover += np.abs(trades).sum()
+            elif amount > 0:
+                cost = rate * amount
+                shares = shares + targets * (amount - cost) / prices[row]
+                costs += cost
+                turnover += amount
+
+            after = events[np.searchsorted(events, row, side="right") :]
+            end = int(after[0]) if len(after) else days
+            stretch = prices[row:end] @ shares
+
+            # With a threshold the stretch ends early, on the first day drifted
+            if rebalance == "threshold" and end - row > 1:
+                weights = prices[row + 1 : end] * shares / stretch[1:, None]
+                (breaches,) = np.nonzero(np.abs(weights - targets).max(axis=1) > threshold)
+                if len(breaches):
+                    end = row + 1 + int(breaches[0])
+                    stretch = stretch[: end - row]
+
+            values[row:end] = stretch
+            row = end
+
+        labels = dates.strftime("%Y-%m-%d")
+        series = pd.DataFrame({"portfolio_value": values}, index=labels.rename("date"))
+        final = shares * prices[-1]
+        statistics = {}
+        if days > 1:
+            statistics = analyze(dict(zip(labels, values)), contributions, windows=())
+            statistics.pop("returns")
+            statistics.pop("rolling")
+
+        return {
+            "series": series,
+            "rebalances": rebalances,
+            "invested": float(contributions.sum()),
+            "costs": float(costs),
+            "turnover": float(turnover),
+            "weights": {
+                ticker: float(value / final.sum() * 100) for ticker, value in zip(tickers, final)
+            },
+            "statistics": statistics,
+        }
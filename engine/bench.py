@@ -0,0 +1,77 @@
+import json
+import sys
+import time
+from datetime import datetime
+
+from flask import Flask, jsonify
+from rich import print
+
+from engine import DCA
+from engine.serialize import dumps, series_json
+from prices import Prices
+
+TICKERS = ["SPY", "AAPL", "MSFT", "JNJ", "PG", "KO", "XOM", "JPM"]
+
+
+def _time(function, repeat: int) -> float:
+    function()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def bench(start: str = "2000-01-03", repeat: int = 50) -> dict:
+    """
+    Times serializing a multi-year, multi-ticker DCA series response both ways.
+
+    Args:
+        start: The first day of the series
+        repeat: The number of timed runs of each path
+
+    Returns:
+        A dict with the number of 'days', the milliseconds per response of the
+        'roundtrip' (to_json, json.loads, jsonify) and 'direct' paths, and
+        whether their bodies decode to 'equal' values. The text can differ
+        where to_json spells a float with more digits than its shortest repr.
+    """
+    allocations = {ticker: 100 / len(TICKERS) for ticker in TICKERS}
+    series = DCA.series(start, datetime.now(), 500, allocations)
+    series = series[series != 0].dropna()
+
+    app = Flask(__name__)
+
+    def roundtrip() -> bytes:
+        port_val = json.loads(series.to_json())["portfolio_value"]
+        with app.app_context():
+            return jsonify({"status": 1, "data": {"series": port_val}}).get_data()
+
+    def direct() -> bytes:
+        port_val = series_json(series["portfolio_value"])
+        return f"{dumps({'status': 1, 'data': {'series': port_val}})}\n".encode()
+
+    return {
+        "days": len(series),
+        "roundtrip": _time(roundtrip, repeat),
+        "direct": _time(direct, repeat),
+        "equal": json.loads(roundtrip()) == json.loads(direct()),
+    }
+
+
+def main():
+    if not Prices.load():
+        Prices.build()
+
+    result = bench(*sys.argv[1:2])
+    print(
+        f"[green][+] {result['days']} days of {len(TICKERS)} tickers: "
+        f"{result['roundtrip']:.2f} ms through to_json, json.loads and jsonify, "
+        f"{result['direct']:.2f} ms direct ({result['roundtrip'] / result['direct']:.1f}x)"
+    )
+    if not result["equal"]:
+        print("[red][!] The response bodies decode to different values")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
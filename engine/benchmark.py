@@ -0,0 +1,143 @@
+import threading
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .dca import _day
+
+
+class BenchmarkCache:
+    """
+    Serves the DCA series of benchmark tickers from per-ticker prefix sums.
+
+    For each benchmark the units bought by contributing $1 on the first
+    trading day on or after every month start are summed once over its whole
+    history. The series of any start date is then that running total minus
+    its value before the start month (one lookup), plus the contribution on
+    the start date itself, times the growth since the first close and the
+    monthly amount. Tables are rebuilt when the price data version changes.
+    """
+
+    tickers: List[str] = ["SPY"]
+
+    def __init__(self, store):
+        self.store = store
+        self._tables: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def set_tickers(self, tickers: List[str]):
+        """
+        Sets the tickers that can be served as benchmarks.
+
+        Args:
+            tickers: The benchmark tickers
+        """
+        self.tickers = list(tickers)
+        with self._lock:
+            self._tables = {t: table for t, table in self._tables.items() if t in tickers}
+
+    def _table(self, ticker: str) -> dict:
+        version = self.store.version
+        with self._lock:
+            table = self._tables.get(ticker)
+        if table is not None and table["version"] == version:
+            return table
+
+        arrays = self.store.arrays(ticker)
+        calendar = pd.date_range(
+            np.datetime64(int(arrays["day"][0]), "D"),
+            np.datetime64(int(arrays["day"][-1]), "D"),
+            freq="D",
+        )
+        # The growth since the first close, NaN on the days without one
+        day = np.arange(arrays["day"][0], arrays["day"][-1] + 1)
+        growth = self.store.growth_many([ticker] * len(day), np.full_like(day, day[0]), day, "nan")
+        days = len(calendar)
+
+        # The first trading row on or after each row
+        rows = np.where(np.isnan(growth), days, np.arange(days))
+        following = np.minimum.accumulate(rows[::-1])[::-1]
+
+        buys = np.unique(following[np.union1d([0], np.flatnonzero(calendar.day == 1))])
+        buys = buys[buys < days]
+        units = np.zeros(days)
+        units[buys] = 1.0 / growth[buys]
+
+        table = {
+            "version": version,
+            "calendar": calendar,
+            "labels": calendar.strftime("%Y-%m-%d").to_numpy(),
+            "growth": np.nan_to_num(growth),
+            "following": following,
+            "units": np.cumsum(units),
+        }
+        with self._lock:
+            self._tables[ticker] = table
+        return table
+
+    def warm(self):
+        """
+        Builds the tables of every benchmark ticker.
+        """
+        for ticker in self.tickers:
+            self._table(ticker)
+
+    def series(
+        self, start_date: date, end_date: date, monthly_savings: float, ticker: str = "SPY"
+    ) -> pd.DataFrame:
+        """
+        Returns the DCA series of a benchmark, as DCA.series would compute it.
+
+        Args:
+            start_date: The first day of the investment period
+            end_date: The last day of the investment period
+            monthly_savings: The amount to invest each month
+            ticker: The benchmark ticker
+
+        Returns:
+            A DataFrame indexed by 'YYYY-MM-DD' calendar day, named 'date',
+            with the 'portfolio_value' of each day.
+
+        Raises:
+            ValueError: If the ticker is not a benchmark.
+        """
+        if ticker not in self.tickers:
+            raise ValueError(f"Unsupported benchmark {ticker}")
+
+        table = self._table(ticker)
+        calendar = table["calendar"]
+        start, end = _day(start_date), _day(end_date)
+        days = len(calendar)
+
+        # The contribution row of the start date and of the month after it
+        following = np.append(table["following"], days)
+        bought = following[calendar.searchsorted(start)]
+        rolled = following[calendar.searchsorted(start + pd.offsets.MonthBegin(1))]
+
+        # Units from the month after the start month on, i.e. the running
+        # total minus its value before that month, plus the start date's own
+        # contribution unless it falls on the same row
+        cumulative = table["units"]
+        units = np.zeros(days)
+        if rolled < days:
+            units[rolled:] = cumulative[rolled:] - (cumulative[rolled - 1] if rolled else 0.0)
+        if bought < rolled:
+            units[bought:] += 1.0 / table["growth"][bought]
+
+        # Days outside the ticker's history are valued at 0
+        lo, hi = calendar.searchsorted(start), calendar.searchsorted(end, side="right")
+        before = pd.date_range(start, min(end, calendar[0] - pd.Timedelta(days=1)), freq="D")
+        after = pd.date_range(max(start, calendar[-1] + pd.Timedelta(days=1)), end, freq="D")
+        labels = np.concatenate(
+            [before.strftime("%Y-%m-%d"), table["labels"][lo:hi], after.strftime("%Y-%m-%d")]
+        )
+        values = np.concatenate(
+            [
+                np.zeros(len(before)),
+                units[lo:hi] * table["growth"][lo:hi] * monthly_savings,
+                np.zeros(len(after)),
+            ]
+        )
+        return pd.DataFrame({"portfolio_value": values}, index=pd.Index(labels, name="date"))
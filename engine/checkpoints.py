@@ -0,0 +1,139 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .ledger import EPSILON
+
+
+def _signed(orders: pd.DataFrame) -> tuple:
+    # Share and cash changes of each order: buys add, sells take away
+    sign = np.where(orders["Order_Type"].to_numpy() == "sell", -1.0, 1.0)
+    shares = orders["Shares"].to_numpy(dtype=np.float64) * sign
+    return shares, shares * orders["Price_Per_Share"].to_numpy(dtype=np.float64)
+
+
+def _holdings(tickers, shares) -> Dict[str, float]:
+    return {
+        ticker: float(held) for ticker, held in zip(tickers, shares) if abs(held) > EPSILON
+    }
+
+
+class PositionCheckpoints:
+    """
+    Snapshots of a portfolio's holdings, so a point-in-time query replays only
+    the orders after the nearest one.
+
+    A checkpoint holds the shares of every ticker and the net amount invested
+    after all orders up to a date. One is taken after the last order of every
+    month, and within a month after the last order of any day that brings the
+    orders since the previous checkpoint to `every`. The holdings on a date
+    are then its nearest checkpoint plus at most a month of orders, whatever
+    the length of the history.
+    """
+
+    every = 50
+
+    def __init__(self, store):
+        self.store = store
+
+    def set_every(self, every: int):
+        """
+        Sets how many orders a month can go without a checkpoint.
+
+        Args:
+            every: The number of orders
+        """
+        self.every = max(every, 1)
+
+    def build(self, orders: pd.DataFrame) -> List[dict]:
+        """
+        Takes the checkpoints of a whole order history in one pass.
+
+        Args:
+            orders: The orders, as parse_orders returns them
+
+        Returns:
+            The checkpoints in date order, each with its 'date', the number
+            of 'orders' up to and including that date, the 'holdings' as a
+            dict of ticker to shares and the net amount 'invested'.
+        """
+        orders = orders.sort_index().sort_values("Date", kind="stable")
+        shares, flows = _signed(orders)
+        tickers, columns = np.unique(orders["Ticker"].to_numpy(), return_inverse=True)
+
+        held = np.zeros((len(orders), len(tickers)))
+        held[np.arange(len(orders)), columns] = shares
+        held = np.cumsum(held, axis=0)
+        invested = np.cumsum(flows)
+
+        # The last order of each day, and the month of each of those days
+        dates = orders["Date"].to_numpy(dtype="datetime64[D]")
+        ends = np.append(np.flatnonzero(dates[1:] != dates[:-1]), len(dates) - 1)
+        months = dates[ends].astype("datetime64[M]")
+
+        checkpoints, since = [], 0
+        for k, end in enumerate(ends):
+            month_ends = k + 1 == len(ends) or months[k + 1] != months[k]
+            if month_ends or end + 1 - since >= self.every:
+                checkpoints.append(
+                    {
+                        "date": str(dates[end]),
+                        "orders": int(end + 1),
+                        "holdings": _holdings(tickers, held[end]),
+                        "invested": float(invested[end]),
+                    }
+                )
+                since = end + 1
+        return checkpoints
+
+    def advance(self, checkpoint: dict | None, orders: pd.DataFrame | None) -> dict:
+        """
+        Applies the orders after a checkpoint to it.
+
+        Args:
+            checkpoint: The checkpoint, or None to start from nothing
+            orders: The orders after the checkpoint, as parse_orders returns
+                them, or None
+
+        Returns:
+            The 'holdings' and amount 'invested' after the orders.
+        """
+        holdings = dict(checkpoint["holdings"]) if checkpoint else {}
+        invested = checkpoint["invested"] if checkpoint else 0.0
+        if orders is not None and not orders.empty:
+            shares, flows = _signed(orders)
+            changes = pd.Series(shares).groupby(orders["Ticker"].to_numpy()).sum()
+            for ticker, change in changes.items():
+                holdings[ticker] = holdings.get(ticker, 0.0) + change
+            holdings = _holdings(holdings.keys(), holdings.values())
+            invested += float(flows.sum())
+        return {"holdings": holdings, "invested": float(invested)}
+
+    def value(self, holdings: Dict[str, float], date) -> dict:
+        """
+        Values holdings at the close of a date.
+
+        Args:
+            holdings: A dict of ticker to shares
+            date: The date, valued at each ticker's last close on or before it
+
+        Returns:
+            The total 'value' and, per ticker, its 'shares', 'close' and
+            'value'. A ticker without a close yet is valued at 0.
+        """
+        tickers = list(holdings)
+        closes = self.store.closes(tickers, [date], missing="previous")[0]
+        closes = np.nan_to_num(closes)
+        positions = {
+            ticker: {
+                "shares": holdings[ticker],
+                "close": float(close),
+                "value": float(holdings[ticker] * close),
+            }
+            for ticker, close in zip(tickers, closes)
+        }
+        return {
+            "value": float(sum(position["value"] for position in positions.values())),
+            "positions": positions,
+        }
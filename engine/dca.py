@@ -0,0 +1,158 @@
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from prices import to_days
+
+
+def _day(value) -> pd.Timestamp:
+    if isinstance(value, datetime):
+        value = value.date()
+    return pd.Timestamp(value)
+
+
+class DcaEngine:
+    """
+    Values monthly dollar-cost averaging into a set of tickers with array operations.
+
+    Each ticker gets a contribution on its first trading day on or after the
+    start date and on or after the first of every following month. A series
+    is linear in the allocations, so every ticker is first valued as the
+    units bought by contributing $1 each month, and a portfolio is a weighted
+    sum of those unit series.
+
+    A unit series is valued from the store's growth factors since the
+    ticker's first close: $1 put in on day b is worth growth(t) / growth(b)
+    on day t.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def calendar(self, start_date: date, end_date: date) -> pd.DatetimeIndex:
+        """
+        Args:
+            start_date: The first day
+            end_date: The last day
+
+        Returns: Every calendar day from start_date to end_date, inclusive.
+        """
+        return pd.date_range(_day(start_date), _day(end_date), freq="D", name="date")
+
+    def unit_values(
+        self, tickers: List[str], start_date: date, end_date: date
+    ) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+        """
+        Values contributing $1 a month to each ticker on every calendar day.
+
+        Args:
+            tickers: The stock tickers
+            start_date: The first day, which also gets a contribution
+            end_date: The last day
+
+        Returns:
+            The calendar and a float64 array of shape (days, len(tickers)).
+            Days a ticker did not trade are valued at 0.
+
+        Raises:
+            ValueError: If a ticker is unknown.
+        """
+        self.store.manifest.validate(tickers)
+        calendar = self.calendar(start_date, end_date)
+        days = len(calendar)
+
+        # The growth of each ticker since its first close, NaN on the days it
+        # did not trade, in one batch of (ticker, day) queries
+        firsts = to_days([self.store.manifest.entry(ticker)["first"] for ticker in tickers])
+        growth = (
+            self.store.growth_many(
+                np.repeat(np.asarray(tickers, dtype=object), days),
+                np.repeat(firsts, days),
+                np.tile(to_days(calendar), len(tickers)),
+                missing="nan",
+            )
+            .reshape(len(tickers), days)
+            .T
+        )
+
+        # The first trading row on or after each row, or days if there is none
+        rows = np.where(np.isnan(growth), days, np.arange(days)[:, None])
+        following = np.minimum.accumulate(rows[::-1], axis=0)[::-1]
+
+        starts = np.flatnonzero(calendar.day == 1)
+        starts = np.union1d([0], starts) if days else starts
+        units = np.zeros_like(growth)
+        for j in range(len(tickers)):
+            buys = np.unique(following[starts, j])
+            buys = buys[buys < days]
+            units[buys, j] = 1.0 / growth[buys, j]
+
+        return calendar, np.nan_to_num(np.cumsum(units, axis=0) * growth)
+
+    def scenarios(
+        self,
+        start_date: date,
+        end_date: date,
+        savings: List[float],
+        allocations: List[Dict[str, float]],
+    ) -> Tuple[pd.Index, np.ndarray]:
+        """
+        Values every combination of monthly amounts and allocations in one batch.
+
+        The unit series of all tickers involved are computed once and
+        multiplied by a (tickers, allocations) weight matrix, then scaled by
+        each monthly amount.
+
+        Args:
+            start_date: The first day of the investment period
+            end_date: The last day of the investment period
+            savings: The monthly amounts to invest
+            allocations: The allocations, each a dict mapping tickers to
+                allocation percentages
+
+        Returns:
+            The 'YYYY-MM-DD' calendar days, named 'date', and a float64 array
+            of shape (days, len(allocations), len(savings)) with the
+            portfolio value of each scenario on each day.
+
+        Raises:
+            ValueError: If a ticker is unknown.
+        """
+        tickers = list(dict.fromkeys(t for allocation in allocations for t in allocation))
+        calendar, values = self.unit_values(tickers, start_date, end_date)
+        weights = np.array(
+            [[allocation.get(t, 0) / 100 for allocation in allocations] for t in tickers]
+        ).reshape(len(tickers), len(allocations))
+
+        portfolios = values @ weights
+        amounts = np.asarray(savings, dtype=np.float64)
+        return calendar.strftime("%Y-%m-%d"), portfolios[:, :, None] * amounts
+
+    def series(
+        self,
+        start_date: date,
+        end_date: date,
+        monthly_savings: float,
+        allocations: Dict[str, float],
+    ) -> pd.DataFrame:
+        """
+        Generates the daily value of investing monthly_savings every month.
+
+        Args:
+            start_date: The first day of the investment period
+            end_date: The last day of the investment period
+            monthly_savings: The amount to invest each month
+            allocations: A dict mapping tickers to allocation percentages,
+                e.g. {"AAPL": 50, "MSFT": 50}
+
+        Returns:
+            A DataFrame indexed by 'YYYY-MM-DD' calendar day, named 'date',
+            with the 'portfolio_value' of each day. Days the tickers did not
+            trade are valued at 0.
+        """
+        calendar, values = self.scenarios(
+            start_date, end_date, [monthly_savings], [allocations]
+        )
+        return pd.DataFrame({"portfolio_value": values[:, 0, 0]}, index=calendar)
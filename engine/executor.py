@@ -0,0 +1,179 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+
+class ComputeBusy(Exception):
+    """
+    Raised when the compute executor already has as many tasks as it queues.
+    """
+
+
+def _initialize(settings: dict):
+    # Runs once in every worker process, before any task
+    from engine import Benchmarks, Replay
+    from prices import Prices
+
+    Prices.set_paths(settings["data_dir"], settings["store_dir"])
+    Prices.set_compact(settings["compact"])
+    Prices.set_shared(settings["shared_dir"])
+    Prices.cache.set_capacity(settings["cache_bytes"])
+    if settings["dataset"]:
+        Prices.set_dataset(settings["dataset"])
+    Replay.set_enabled(settings["replay"])
+    Replay.set_valuation(settings["valuation"])
+    Benchmarks.set_tickers(settings["benchmarks"])
+
+    # Map the compiled store and the published matrix segment up front
+    if Prices.load():
+        Prices.matrix()
+
+
+class ComputeExecutor:
+    """
+    Runs CPU-bound portfolio computations in a pool of worker processes.
+
+    Request threads hand a task to the pool and wait for its result, so
+    pandas and NumPy work holds the GIL of a worker process instead of the
+    server's, and other routes keep being served meanwhile. Workers are
+    spawned on the first task with the price store configured as in the
+    server and mapped in, so they share the compiled store and aligned matrix
+    through the page cache.
+
+    With no workers, tasks run in the calling thread.
+    """
+
+    workers = 0
+    timeout = 30.0
+    max_queue = 64
+
+    def __init__(self, store):
+        self.store = store
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def set_workers(self, workers: int):
+        """
+        Sets the number of worker processes.
+
+        Args:
+            workers: The pool size, 0 to run tasks in the calling thread
+        """
+        self.shutdown()
+        self.workers = max(workers, 0)
+
+    def set_timeout(self, timeout: float):
+        """
+        Sets how long a request waits for its task.
+
+        Args:
+            timeout: The timeout in seconds
+        """
+        self.timeout = timeout
+
+    def set_max_queue(self, max_queue: int):
+        """
+        Sets how many tasks can be running or waiting for a worker at once.
+
+        Args:
+            max_queue: The queue depth limit
+        """
+        self.max_queue = max_queue
+
+    def _settings(self) -> dict:
+        from engine import Benchmarks, Replay
+
+        dataset = self.store.dataset
+        return {
+            "data_dir": self.store.data_dir,
+            "store_dir": self.store.store_dir,
+            "compact": self.store.compact,
+            "shared_dir": self.store.shared_dir,
+            "cache_bytes": self.store.cache.max_bytes,
+            "dataset": dataset.path if dataset is not None else None,
+            "replay": Replay.enabled,
+            "valuation": Replay.valuation,
+            "benchmarks": list(Benchmarks.tickers),
+        }
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned rather than forked, as the server runs threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize,
+                    initargs=(self._settings(),),
+                )
+            return self._pool
+
+    def run(self, function: Callable, *args):
+        """
+        Runs a task in a worker process and waits for its result.
+
+        Args:
+            function: A module-level function, see engine.tasks
+            *args: Its picklable arguments
+
+        Returns:
+            What the function returns.
+
+        Raises:
+            ComputeBusy: If max_queue tasks are already running or waiting, or
+                if a worker process died. A new pool serves the next task.
+            TimeoutError: If the task did not finish within the timeout. It
+                still runs to completion in its worker, and counts towards
+                max_queue until it does.
+        """
+        if not self.workers:
+            return function(*args)
+
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise ComputeBusy(f"{self._pending} computations already queued")
+            self._pending += 1
+
+        pool = None
+        try:
+            pool = self._executor()
+            future = pool.submit(function, *args)
+        except BaseException as e:
+            self._finished()
+            if isinstance(e, BrokenProcessPool):
+                self._replace(pool)
+                raise ComputeBusy("A compute worker stopped") from e
+            raise
+        # Released when the task ends, not when the request stops waiting
+        future.add_done_callback(self._finished)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+        except BrokenProcessPool as e:
+            self._replace(pool)
+            raise ComputeBusy("A compute worker stopped") from e
+
+    def _finished(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def _replace(self, pool: ProcessPoolExecutor | None):
+        # A worker died, start a new pool for the next task
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+
+    def shutdown(self):
+        """
+        Stops the worker processes, letting running tasks finish.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
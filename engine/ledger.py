@@ -0,0 +1,228 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Shares left below this are rounding noise of float share counts
+EPSILON = 1e-9
+
+
+class PositionLedger:
+    """
+    The FIFO tax lots of a portfolio, built in one pass over its orders.
+
+    Every buy opens a lot. Its ticker's lots live in preallocated arrays
+    holding the open shares, cost per share and date of each lot, with a head
+    index at the oldest open one. A sell consumes lots from the head: one
+    cumulative sum over the open lots finds where it ends, so a sell costs
+    O(open lots) array work, with no Python loop over lots. Each consumed
+    slice becomes a closed lot with its proceeds, cost basis and gain.
+
+    Unlike the value replay, which subtracts a sell's proceeds from the value,
+    the ledger tracks share counts, so values after a sale only move with the
+    shares still held.
+    """
+
+    def __init__(self, orders: pd.DataFrame):
+        """
+        Args:
+            orders: The orders, as parse_orders returns them. Orders on the
+                same day apply in their original order.
+
+        Raises:
+            ValueError: If a sell exceeds the shares held.
+        """
+        orders = orders.sort_index().sort_values("Date", kind="stable")
+        dates = orders["Date"].to_numpy(dtype="datetime64[D]")
+        types = orders["Order_Type"].to_numpy()
+        tickers = orders["Ticker"].to_numpy()
+        shares = orders["Shares"].to_numpy(dtype=np.float64)
+        prices = orders["Price_Per_Share"].to_numpy(dtype=np.float64)
+
+        buys = pd.Series(tickers[types == "buy"]).value_counts()
+        self._shares = {t: np.zeros(n) for t, n in buys.items()}
+        self._costs = {t: np.zeros(n) for t, n in buys.items()}
+        self._dates = {t: np.zeros(n, dtype="datetime64[D]") for t, n in buys.items()}
+        self._head = dict.fromkeys(buys.index, 0)
+        self._tail = dict.fromkeys(buys.index, 0)
+
+        # The lots each sell closed, and the sell's ticker, date and price
+        closed: Dict[str, List[np.ndarray]] = {"acquired": [], "shares": [], "cost": []}
+        sells: Dict[str, list] = {"count": [], "ticker": [], "sold": [], "price": []}
+        changes = np.zeros(len(orders))
+
+        for i, (date, order_type, ticker, quantity, price) in enumerate(
+            zip(dates, types, tickers, shares, prices)
+        ):
+            if order_type == "buy":
+                tail = self._tail[ticker]
+                self._shares[ticker][tail] = quantity
+                self._costs[ticker][tail] = price
+                self._dates[ticker][tail] = date
+                self._tail[ticker] = tail + 1
+                changes[i] = quantity
+            elif order_type == "sell":
+                head, tail = self._head.get(ticker, 0), self._tail.get(ticker, 0)
+                open_shares = self._shares.get(ticker, np.zeros(0))[head:tail]
+                held = np.cumsum(open_shares)
+                if len(held) == 0 or held[-1] < quantity - EPSILON:
+                    raise ValueError(
+                        f"Cannot sell {quantity:g} shares of {ticker} on {date}, "
+                        f"only {held[-1] if len(held) else 0:g} held"
+                    )
+
+                # The lot the sell ends in, and the shares it takes from each
+                last = min(int(np.searchsorted(held, quantity - EPSILON)), len(held) - 1)
+                taken = open_shares[: last + 1].copy()
+                taken[last] = quantity - (held[last - 1] if last else 0.0)
+
+                closed["acquired"].append(self._dates[ticker][head : head + last + 1])
+                closed["shares"].append(taken)
+                closed["cost"].append(self._costs[ticker][head : head + last + 1])
+                sells["count"].append(last + 1)
+                sells["ticker"].append(ticker)
+                sells["sold"].append(date)
+                sells["price"].append(price)
+
+                self._shares[ticker][head + last] -= taken[last]
+                self._shares[ticker][head : head + last] = 0.0
+                if self._shares[ticker][head + last] <= EPSILON:
+                    self._shares[ticker][head + last] = 0.0
+                    last += 1
+                self._head[ticker] = head + last
+                changes[i] = -quantity
+            else:
+                print(f"Unrecognized order type: {order_type}")
+
+        self.changes = pd.DataFrame({"Date": dates, "Ticker": tickers, "Shares": changes})
+
+        if sells["count"]:
+            realized = pd.DataFrame(
+                {
+                    "ticker": np.repeat(np.array(sells["ticker"], dtype=object), sells["count"]),
+                    "acquired": np.concatenate(closed["acquired"]),
+                    "sold": np.repeat(np.array(sells["sold"]), sells["count"]),
+                    "shares": np.concatenate(closed["shares"]),
+                    "cost": np.concatenate(closed["cost"]),
+                    "price": np.repeat(np.array(sells["price"]), sells["count"]),
+                }
+            )
+        else:
+            realized = pd.DataFrame(
+                {
+                    "ticker": pd.Series(dtype=object),
+                    "acquired": pd.Series(dtype="datetime64[s]"),
+                    "sold": pd.Series(dtype="datetime64[s]"),
+                    "shares": pd.Series(dtype=np.float64),
+                    "cost": pd.Series(dtype=np.float64),
+                    "price": pd.Series(dtype=np.float64),
+                }
+            )
+        realized["proceeds"] = realized["shares"] * realized["price"]
+        realized["cost_basis"] = realized["shares"] * realized["cost"]
+        realized["gain"] = realized["proceeds"] - realized["cost_basis"]
+        # Held for more than one year
+        realized["long_term"] = pd.to_datetime(realized["sold"]) > pd.to_datetime(
+            realized["acquired"]
+        ) + pd.DateOffset(years=1)
+        self.realized = realized.drop(columns=["cost", "price"])
+
+    def open_lots(self) -> pd.DataFrame:
+        """
+        Returns: The open lots, oldest first per ticker, with their 'ticker',
+            'acquired' date, open 'shares' and 'cost' per share.
+        """
+        frames = [
+            pd.DataFrame(
+                {
+                    "ticker": ticker,
+                    "acquired": self._dates[ticker][head : self._tail[ticker]],
+                    "shares": self._shares[ticker][head : self._tail[ticker]],
+                    "cost": self._costs[ticker][head : self._tail[ticker]],
+                }
+            )
+            for ticker, head in self._head.items()
+        ]
+        if not frames:
+            return pd.DataFrame(columns=["ticker", "acquired", "shares", "cost"])
+        lots = pd.concat(frames, ignore_index=True)
+        return lots[lots["shares"] > EPSILON].reset_index(drop=True)
+
+    def holdings(self) -> Dict[str, float]:
+        """
+        Returns: The shares held of each ticker with open lots.
+        """
+        held = self.open_lots().groupby("ticker")["shares"].sum()
+        return {ticker: float(shares) for ticker, shares in held.items()}
+
+    def realized_by_year(self) -> Dict[str, dict]:
+        """
+        Returns: The realized gains of each tax year, by sell date, with the
+            'proceeds', 'cost_basis', 'short_term' and 'long_term' gains and
+            their 'total'.
+        """
+        realized = self.realized
+        years = pd.to_datetime(realized["sold"]).dt.year
+        report = {}
+        for year, lots in realized.groupby(years):
+            long_term = lots.loc[lots["long_term"], "gain"].sum()
+            short_term = lots.loc[~lots["long_term"], "gain"].sum()
+            report[str(year)] = {
+                "proceeds": float(lots["proceeds"].sum()),
+                "cost_basis": float(lots["cost_basis"].sum()),
+                "short_term": float(short_term),
+                "long_term": float(long_term),
+                "total": float(short_term + long_term),
+            }
+        return report
+
+    def unrealized(self, closes: Dict[str, float]) -> Dict[str, dict]:
+        """
+        Values the open lots.
+
+        Args:
+            closes: The latest close of each held ticker
+
+        Returns:
+            For each held ticker its 'shares', 'cost_basis', 'market_value'
+            and 'gain'.
+        """
+        lots = self.open_lots()
+        lots["cost_basis"] = lots["shares"] * lots["cost"]
+        positions = lots.groupby("ticker")[["shares", "cost_basis"]].sum()
+        report = {}
+        for ticker, position in positions.iterrows():
+            market_value = position["shares"] * closes[ticker]
+            report[ticker] = {
+                "shares": float(position["shares"]),
+                "cost_basis": float(position["cost_basis"]),
+                "market_value": float(market_value),
+                "gain": float(market_value - position["cost_basis"]),
+            }
+        return report
+
+    def values(self, matrix, end=None) -> pd.DataFrame:
+        """
+        Values the shares held of each ticker on every trading day.
+
+        Args:
+            matrix: The PriceMatrix to value the shares with
+            end: The last day, defaults to the latest price
+
+        Returns:
+            A DataFrame indexed by trading day from the first order, with one
+            value column per ticker. A day without a close for a ticker uses
+            its previous close.
+        """
+        end = matrix.dates[-1] if end is None else end
+        lo, hi = matrix.rows(self.changes["Date"].min(), end)
+        dates = matrix.dates[lo:hi]
+        columns = {}
+        for ticker, changes in self.changes.groupby("Ticker", sort=False):
+            held = np.zeros(hi - lo)
+            rows = dates.searchsorted(changes["Date"].to_numpy())
+            inside = rows < len(dates)
+            np.add.at(held, rows[inside], changes["Shares"].to_numpy()[inside])
+            closes = pd.Series(matrix.closes[lo:hi, matrix.column(ticker)]).ffill()
+            columns[ticker] = np.cumsum(held) * np.nan_to_num(closes.to_numpy())
+        return pd.DataFrame(columns, index=dates)
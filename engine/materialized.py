@@ -0,0 +1,177 @@
+import hashlib
+import json
+from collections import Counter
+from typing import Dict, List
+
+import pandas as pd
+
+from .orders import parse_orders, validate_orders
+from .replay import summarize
+from .serialize import series_json
+
+
+def order_fingerprints(orders: pd.DataFrame) -> List[List[str]]:
+    """
+    Args:
+        orders: The orders, as parse_orders returns them
+
+    Returns: A sorted list of [date, digest] pairs, one per order.
+    """
+    fingerprints = []
+    for date, order_type, ticker, shares, price in zip(
+        orders["Date"].dt.strftime("%Y-%m-%d"),
+        orders["Order_Type"],
+        orders["Ticker"],
+        orders["Shares"],
+        orders["Price_Per_Share"],
+    ):
+        key = f"{order_type}|{ticker}|{float(shares)!r}|{float(price)!r}"
+        fingerprints.append([date, hashlib.sha1(key.encode()).hexdigest()])
+    return sorted(fingerprints)
+
+
+def orders_digest(fingerprints: List[List[str]]) -> str:
+    return hashlib.sha256(json.dumps(fingerprints).encode()).hexdigest()
+
+
+def _build(version: str) -> str | None:
+    # "<built_ms>-<delta_rows>" for a compiled store, "csv.<n>" otherwise
+    return version.split("-")[0] if "-" in version else None
+
+
+class MaterializedSeries:
+    """
+    Keeps a portfolio's daily value series up to date without replaying it all.
+
+    A record holds the series and allocations of a portfolio together with
+    what they were computed from: the digest of its orders, the price data
+    version and the as-of date. When any of them changes only the days that
+    can differ are replayed:
+
+    - from the earliest date at which an order was added, removed or changed
+    - from the day after a held ticker's last close, when bars were ingested
+    - the days after the previous as-of date
+
+    A recompiled store, a changed first order date or valuation replays
+    everything.
+    The final day is always replayed, since the allocations come from it.
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.store = replay.store
+
+    def refresh(self, record: dict | None, orders_json, as_of=None) -> dict:
+        """
+        Brings a portfolio's materialized series up to date.
+
+        Args:
+            record: The previous record of the portfolio, or None
+            orders_json: A JSON string or list of the portfolio's order dicts
+            as_of: The last day of the series, defaults to the latest price
+
+        Returns:
+            The up-to-date record, with its 'orders_digest', 'price_version',
+            'as_of' date, 'series', 'allocations' and the 'state' needed to
+            refresh it again. 'replayed' is the number of days recomputed.
+
+        Raises:
+            ValueError: If the orders are invalid or reference missing prices.
+        """
+        orders = parse_orders(orders_json)
+        matrix = self.store.matrix()
+        version = self.store.version
+
+        end = matrix.dates[-1]
+        if as_of is not None:
+            end = min(end, pd.Timestamp(as_of))
+        orders = orders[orders["Date"] <= end]
+        if orders.empty:
+            raise ValueError("No orders on or before the as-of date")
+        validate_orders(orders, self.store.manifest)
+
+        lo, hi = matrix.rows(orders["Date"].min(), end)
+        if hi <= lo:
+            raise ValueError("No trading days between the first order and as-of date")
+        dates = matrix.dates[lo:hi].strftime("%Y-%m-%d")
+
+        fingerprints = order_fingerprints(orders)
+        digest = orders_digest(fingerprints)
+        held = sorted(set(orders["Ticker"]))
+        last_days = {ticker: self.store.manifest.entry(ticker)["last"] for ticker in held}
+
+        valuation = self.replay.valuation
+        if (
+            record is not None
+            and record["orders_digest"] == digest
+            and record["price_version"] == version
+            and record["as_of"] == dates[-1]
+            and record["state"].get("valuation", "replay") == valuation
+        ):
+            return dict(record, replayed=0)
+
+        first = self._first_changed(record, fingerprints, version, last_days, dates[0])
+        row = lo if first is None else max(lo, min(matrix.row(first), hi - 1))
+
+        tail, allocations = summarize(
+            self.replay.values(orders, matrix.dates[row], dates[-1])
+        )
+        series = {}
+        if row > lo:
+            kept = dates[row - lo]
+            series = {day: value for day, value in record["series"].items() if day < kept}
+        # The series is stored as a JSONB object, so it stays a dict here,
+        # with the values as series_json rounds them for the responses
+        series.update(json.loads(series_json(tail)))
+
+        return {
+            "orders_digest": digest,
+            "price_version": version,
+            "as_of": dates[-1],
+            "series": series,
+            "allocations": {ticker: float(value) for ticker, value in allocations.items()},
+            "state": {
+                "valuation": valuation,
+                "start": dates[0],
+                "orders": fingerprints,
+                "last_days": last_days,
+            },
+            "replayed": hi - row,
+        }
+
+    def _first_changed(
+        self,
+        record: dict | None,
+        fingerprints: List[List[str]],
+        version: str,
+        last_days: Dict[str, str],
+        start: str,
+    ) -> str | None:
+        # The first day that may differ from the record, None to replay it all
+        if record is None or record["state"]["start"] != start:
+            return None
+        # Records from before the ledger valuation were replayed
+        if record["state"].get("valuation", "replay") != self.replay.valuation:
+            return None
+        if record["price_version"] != version and _build(
+            record["price_version"]
+        ) != _build(version):
+            return None
+
+        changed = []
+        old = Counter(tuple(fingerprint) for fingerprint in record["state"]["orders"])
+        new = Counter(tuple(fingerprint) for fingerprint in fingerprints)
+        changed += [date for date, _ in (old - new) + (new - old)]
+
+        if record["price_version"] != version:
+            stored = record["state"]["last_days"]
+            for ticker, last in last_days.items():
+                # Newly held tickers come with new orders, covered above
+                if ticker in stored and stored[ticker] != last:
+                    changed.append(
+                        str((pd.Timestamp(stored[ticker]) + pd.Timedelta(days=1)).date())
+                    )
+
+        # Days after the previous as-of date
+        changed.append(str((pd.Timestamp(record["as_of"]) + pd.Timedelta(days=1)).date()))
+        return min(changed)
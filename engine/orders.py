@@ -0,0 +1,61 @@
+import json
+
+import pandas as pd
+
+REQUIRED_COLUMNS = ["Date", "Order_Type", "Ticker", "Shares", "Price_Per_Share"]
+
+
+def parse_orders(orders_json) -> pd.DataFrame:
+    """
+    Parses a list of orders into a DataFrame sorted by date.
+
+    Args:
+        orders_json: A JSON string or list of dicts with the REQUIRED_COLUMNS
+
+    Returns:
+        The orders, with parsed dates, lowercase order types and stripped
+        tickers.
+
+    Raises:
+        ValueError: If there are no orders or a required field is missing.
+    """
+    # Since orders are always provided as JSON, parse them if necessary.
+    if isinstance(orders_json, str):
+        orders_list = json.loads(orders_json)
+    else:
+        orders_list = orders_json
+    orders = pd.DataFrame(orders_list)
+
+    if orders.empty:
+        raise ValueError("Orders JSON is empty. Please provide valid order data.")
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in orders.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required fields in orders JSON: {missing_cols}")
+
+    orders["Date"] = pd.to_datetime(orders["Date"])
+    orders["Order_Type"] = orders["Order_Type"].str.strip().str.lower()
+    orders["Ticker"] = orders["Ticker"].str.strip()
+    orders.sort_values("Date", inplace=True)
+    return orders
+
+
+def validate_orders(orders: pd.DataFrame, manifest):
+    """
+    Checks every ordered ticker against the price manifest.
+
+    Buy orders need a close on or after their date, within the ticker's
+    history.
+
+    Args:
+        orders: The orders, as parse_orders returns them
+        manifest: The prices Manifest
+
+    Raises:
+        ValueError: If a ticker is unknown or a buy is outside its history.
+    """
+    for ticker in orders["Ticker"].unique():
+        if not manifest.has(ticker):
+            raise ValueError(f"Error reading stock data for ticker {ticker}")
+    buys = orders[orders["Order_Type"] == "buy"]
+    for ticker, dates in buys.groupby("Ticker")["Date"]:
+        manifest.validate([ticker], dates.min(), dates.max())
@@ -0,0 +1,256 @@
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ledger import PositionLedger
+from .orders import parse_orders, validate_orders
+
+
+def summarize(portfolio: pd.DataFrame) -> Tuple[pd.Series, dict]:
+    """
+    Turns per-ticker daily values into the series and allocations get_portfolio returns.
+
+    Args:
+        portfolio: A DataFrame indexed by trading day with one value column
+            per ticker
+
+    Returns:
+        A tuple of the daily total value indexed by 'YYYY-MM-DD', for
+        series_json to serialize, and the final allocation percentage of each
+        ticker.
+    """
+    allocations = {}
+    for column in portfolio.columns:
+        allocations[column] = portfolio[column].iloc[-1]
+    # Add the "total" column by summing across all ticker columns for each day
+    portfolio["Value"] = portfolio.sum(axis=1)
+    final_series = portfolio[["Value"]]
+    for item, val in allocations.items():
+        allocations[item] = val / final_series["Value"].iloc[-1] * 100
+    port_val = final_series["Value"].set_axis(final_series.index.strftime("%Y-%m-%d"))
+    return port_val, allocations
+
+
+def insert_buy_order(portfolio, matrix, date, ticker, shares, price_per_share):
+    # Gather the ticker's closes on the portfolio's trading calendar, starting
+    # at the order date (not the overall start_date)
+    closes = matrix.frame([ticker], portfolio.index[0], portfolio.index[-1])
+    temp_df = closes.loc[closes.index >= pd.to_datetime(date), ticker].dropna()
+
+    # Compute daily return relative to the close price on the order date
+    base_close = temp_df.iloc[0]
+    daily_return = temp_df / base_close
+
+    # Calculate the order’s initial value
+    start_val = shares * price_per_share
+
+    # Create a new series for the new order, initializing with zeros across the portfolio's index
+    new_order_series = pd.Series(0.0, index=portfolio.index)
+    new_order_series.loc[daily_return.index] = start_val * daily_return
+
+    # If the ticker already exists, add the new order's series to the existing values;
+    # otherwise, simply assign the new series to that ticker.
+    if ticker in portfolio.columns:
+        portfolio[ticker] = portfolio[ticker].fillna(0) + new_order_series
+    else:
+        portfolio[ticker] = new_order_series
+
+    return portfolio
+
+
+def insert_sell_order(portfolio, date, ticker, shares, price_per_share):
+    order_date = pd.to_datetime(date)
+    sell_amount = shares * price_per_share
+
+    # Make sure the ticker exists
+    if ticker not in portfolio.columns:
+        raise ValueError(
+            f"Ticker {ticker} not found in portfolio. Cannot process sell order."
+        )
+
+    # Subtract the sell amount for every trading day on and after the sell date
+    portfolio.loc[portfolio.index >= order_date, ticker] -= sell_amount
+
+    return portfolio
+
+
+# How values() values holdings: "ledger" from the shares still held, or
+# "replay" from each buy's cost grown by its ticker's closes less each sell's
+# proceeds, the original valuation
+VALUATIONS = ("ledger", "replay")
+
+
+class ReplayEngine:
+    """
+    Replays a portfolio's orders over the aligned price matrix with array operations.
+
+    By default the position ledger values each ticker as the shares still
+    held times its close, so shares that were sold no longer follow the
+    price.
+
+    The "replay" valuation is the original one, kept as its reference: every
+    order becomes one in-place update of its ticker's value column from the
+    order date onward, a buy adding its cost grown by close / close on the
+    order date and a sell subtracting its proceeds. The updates are applied
+    in order date order, in the same floating point order as the per-order
+    pandas implementation, so the output is identical to it.
+    """
+
+    enabled = True
+    valuation = "ledger"
+
+    def __init__(self, store):
+        self.store = store
+
+    def set_valuation(self, valuation: str):
+        """
+        Sets how values() values holdings.
+
+        Args:
+            valuation: One of VALUATIONS
+
+        Raises:
+            ValueError: If the valuation is unknown.
+        """
+        if valuation not in VALUATIONS:
+            raise ValueError(
+                f"Unknown valuation {valuation}, expected one of {', '.join(VALUATIONS)}"
+            )
+        self.valuation = valuation
+
+    def set_enabled(self, enabled: bool):
+        """
+        Sets whether orders are replayed with array operations.
+
+        Args:
+            enabled: False falls back to legacy(), the per-order pandas
+                implementation, and the routes skip the materialized series
+        """
+        self.enabled = enabled
+
+    def legacy(self, orders: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes the values of the "replay" valuation, one pandas update per order.
+
+        Args:
+            orders: The orders, as parse_orders returns them
+
+        Returns:
+            A DataFrame indexed by trading day, with one value column per
+            bought ticker in the order of their first buy.
+
+        Raises:
+            ValueError: If a ticker is sold before it was bought.
+        """
+        # Build the portfolio on the master trading calendar, so every ticker is
+        # valued on the same days regardless of which one was ordered first
+        matrix = self.store.matrix()
+
+        # Overall start and end dates, up to the latest ingested trading day
+        lo, hi = matrix.rows(orders["Date"].min(), matrix.dates[-1])
+        portfolio = pd.DataFrame(index=matrix.dates[lo:hi])
+
+        for _, order in orders.iterrows():
+            order_date = order["Date"]
+            order_type = order["Order_Type"]
+            ticker = order["Ticker"]
+            shares = order["Shares"]
+            price = order["Price_Per_Share"]
+
+            if order_type == "buy":
+                portfolio = insert_buy_order(
+                    portfolio, matrix, order_date, ticker, shares, price
+                )
+            elif order_type == "sell":
+                portfolio = insert_sell_order(portfolio, order_date, ticker, shares, price)
+            else:
+                print(f"Unrecognized order type: {order_type}")
+
+        return portfolio
+
+    def values(self, orders: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+        """
+        Computes the daily value of each ticker held by a list of orders.
+
+        Rows from start onward come out identical to the same rows of a
+        replay over the whole history, so a stored series can be extended or
+        patched with just the rows that changed.
+
+        Args:
+            orders: The orders, as parse_orders returns them
+            start: The first day to compute, defaults to the first order date
+            end: The last day to compute, defaults to the latest price
+
+        Returns:
+            A DataFrame indexed by trading day, with one value column per
+            bought ticker in the order of their first buy.
+
+        Raises:
+            ValueError: If a ticker has no price data after a buy, or is sold
+                before it was bought or, with the ledger, beyond the shares
+                held.
+        """
+        if self.valuation == "ledger":
+            frame = PositionLedger(orders).values(self.store.matrix(), end)
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            return frame
+
+        matrix = self.store.matrix()
+        lo, hi = matrix.rows(orders["Date"].min(), matrix.dates[-1] if end is None else end)
+        if start is not None:
+            lo = max(lo, matrix.row(start))
+
+        columns: Dict[str, np.ndarray] = {}
+        dates = orders["Date"].to_numpy()
+        types = orders["Order_Type"].to_numpy()
+        tickers = orders["Ticker"].to_numpy()
+        amounts = (orders["Shares"] * orders["Price_Per_Share"]).to_numpy()
+
+        for date, order_type, ticker, amount in zip(dates, types, tickers, amounts):
+            first = matrix.row(date)
+            if order_type == "buy":
+                closes = matrix.closes[first:hi, matrix.column(ticker)]
+                (traded,) = np.nonzero(~np.isnan(closes))
+                column = columns.setdefault(ticker, np.zeros(max(hi - lo, 0)))
+                if len(traded) == 0:
+                    # Bought after the last day asked for
+                    if end is not None:
+                        continue
+                    raise ValueError(
+                        f"No price data for ticker {ticker} after {pd.Timestamp(date):%Y-%m-%d}"
+                    )
+                base = closes[traded[0]]
+                traded = traded[first + traded >= lo]
+                column[first - lo + traded] += amount * (closes[traded] / base)
+            elif order_type == "sell":
+                if ticker not in columns:
+                    raise ValueError(
+                        f"Ticker {ticker} not found in portfolio. Cannot process sell order."
+                    )
+                columns[ticker][max(first - lo, 0) :] -= amount
+            else:
+                print(f"Unrecognized order type: {order_type}")
+
+        return pd.DataFrame(columns, index=matrix.dates[lo:hi])
+
+    def run(self, orders_json) -> Tuple[pd.Series, dict]:
+        """
+        Replays orders into a daily portfolio value series.
+
+        Args:
+            orders_json: A JSON string or list of order dicts
+
+        Returns:
+            A tuple of the daily total value indexed by 'YYYY-MM-DD' and the
+            final allocation percentage of each ticker.
+
+        Raises:
+            ValueError: If the orders are invalid or reference missing prices.
+        """
+        orders = parse_orders(orders_json)
+        validate_orders(orders, self.store.manifest)
+        if not self.enabled and self.valuation == "replay":
+            return summarize(self.legacy(orders))
+        return summarize(self.values(orders))
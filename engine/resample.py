@@ -0,0 +1,146 @@
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = ("daily", "weekly", "monthly")
+
+
+def parse_resolution(value: str | None) -> str | int | None:
+    """
+    Parses the 'resolution' query parameter of the series routes.
+
+    Args:
+        value: 'daily', 'weekly', 'monthly', 'points=N' or None
+
+    Returns:
+        None for daily values, 'weekly' or 'monthly', or the number of points
+        to keep.
+
+    Raises:
+        ValueError: If the resolution is not recognized.
+    """
+    if value is None or value.lower() == "daily":
+        return None
+    value = value.lower()
+    if value in RESOLUTIONS:
+        return value
+    if value.startswith("points="):
+        try:
+            points = int(value[len("points=") :])
+        except ValueError:
+            points = 0
+        if points >= 3:
+            return points
+        raise ValueError("points must be an integer of at least 3")
+    raise ValueError(
+        f"Unknown resolution {value}, expected one of {', '.join(RESOLUTIONS)} or points=N"
+    )
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Picks the points that best keep the shape of a line, with
+    Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept. The points in between are split into
+    points - 2 buckets, and each bucket keeps the point forming the largest
+    triangle with the point kept from the previous bucket and the average of
+    the next bucket.
+
+    Args:
+        x: The x coordinates, increasing
+        y: The y coordinates
+        points: The number of points to keep
+
+    Returns:
+        The sorted indices of the kept points.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    edges = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    kept = np.empty(points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    # The average of every bucket, followed by the last point
+    sizes = np.diff(edges)
+    cx = np.append(np.add.reduceat(x[: n - 1], edges[:-1]) / sizes, x[-1])
+    cy = np.append(np.add.reduceat(y[: n - 1], edges[:-1]) / sizes, y[-1])
+
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        areas = np.abs(
+            (x[a] - cx[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy[i + 1] - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+def resample_rows(days: Sequence[str], values: np.ndarray, resolution) -> np.ndarray:
+    """
+    Selects the rows of a daily series to keep at a resolution.
+
+    Weekly and monthly keep the last day of each calendar week (Monday to
+    Sunday) or month, so every point is a value the series really had.
+
+    Args:
+        days: The sorted 'YYYY-MM-DD' days of the series
+        values: The value of each day
+        resolution: A resolution, as parse_resolution returns it
+
+    Returns:
+        The sorted indices of the rows to keep.
+    """
+    n = len(days)
+    if resolution is None or n < 2:
+        return np.arange(n)
+
+    dates = np.asarray(days, dtype="datetime64[D]")
+    if resolution == "weekly":
+        # 1970-01-01 was a Thursday, so this numbers weeks from Monday
+        periods = (dates.astype(np.int64) + 3) // 7
+    elif resolution == "monthly":
+        periods = dates.astype("datetime64[M]").astype(np.int64)
+    else:
+        return lttb(dates.astype(np.float64), np.asarray(values, dtype=np.float64), resolution)
+
+    return np.append(np.flatnonzero(periods[1:] != periods[:-1]), n - 1)
+
+
+def downsample_series(
+    series: Dict[str, float] | pd.Series, resolution
+) -> Dict[str, float] | pd.Series:
+    """
+    Args:
+        series: A daily value series keyed or indexed by sorted 'YYYY-MM-DD'
+            day
+        resolution: A resolution, as parse_resolution returns it
+
+    Returns: The series at the resolution, of the same type.
+    """
+    if resolution is None:
+        return series
+    if isinstance(series, pd.Series):
+        return series.iloc[resample_rows(series.index, series.to_numpy(), resolution)]
+    days = sorted(series)
+    values = np.array([series[day] for day in days], dtype=np.float64)
+    return {days[i]: series[days[i]] for i in resample_rows(days, values, resolution)}
+
+
+def downsample_frame(frame: pd.DataFrame, resolution, column: str) -> pd.DataFrame:
+    """
+    Args:
+        frame: A DataFrame indexed by sorted 'YYYY-MM-DD' day
+        resolution: A resolution, as parse_resolution returns it
+        column: The column whose shape LTTB keeps
+
+    Returns: The rows of the frame at the resolution.
+    """
+    if resolution is None:
+        return frame
+    return frame.iloc[resample_rows(frame.index, frame[column].to_numpy(), resolution)]
@@ -0,0 +1,63 @@
+from datetime import date
+from typing import Dict, List
+
+import pandas as pd
+
+from engine import (DCA, Backtests, Materialized, PositionLedger, Replay,
+                    analyze, analyze_series, cash_flows, parse_orders)
+from prices import Prices
+
+# The computations the routes hand to Compute: module-level functions of
+# picklable arguments, run with the engines of the worker process
+
+
+def portfolio(orders_json) -> tuple:
+    return Replay.run(orders_json)
+
+
+def refresh(record: dict | None, orders_json, as_of=None) -> dict:
+    return Materialized.refresh(record, orders_json, as_of)
+
+
+def dca_series(
+    start_date: date, end_date: date, monthly_savings: float, allocations: Dict[str, float]
+) -> pd.DataFrame:
+    return DCA.series(start_date, end_date, monthly_savings, allocations)
+
+
+def dca_scenarios(
+    start_date: date,
+    end_date: date,
+    savings: List[float],
+    allocations: List[Dict[str, float]],
+) -> tuple:
+    return DCA.scenarios(start_date, end_date, savings, allocations)
+
+
+def analytics(
+    series: Dict[str, float], orders_json, risk_free_rate: float, windows: List[int]
+) -> dict:
+    days = pd.DatetimeIndex(sorted(series))
+    flows = cash_flows(parse_orders(orders_json), days)
+    return analyze(series, flows, risk_free_rate, windows)
+
+
+def analytics_series(series: Dict[str, float], orders_json, windows: List[int]) -> dict:
+    days = pd.DatetimeIndex(sorted(series))
+    flows = cash_flows(parse_orders(orders_json), days)
+    return analyze_series(series, flows, windows)
+
+
+def capital_gains(orders_json) -> dict:
+    ledger = PositionLedger(parse_orders(orders_json))
+    closes = {
+        ticker: float(Prices.arrays(ticker)["close"][-1]) for ticker in ledger.holdings()
+    }
+    return {
+        "realized": ledger.realized_by_year(),
+        "unrealized": ledger.unrealized(closes),
+    }
+
+
+def backtest(allocations: Dict[str, float], start_date: date, end_date: date, params: dict) -> dict:
+    return Backtests.run(allocations, start_date, end_date, **params)
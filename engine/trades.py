@@ -0,0 +1,112 @@
+from typing import IO, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# The fields of a trade_history_data entry
+TRADE_COLUMNS = ["date", "symbol", "transaction_type", "quantity", "price"]
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    # ISO dates in one vectorized pass, anything else parsed one at a time.
+    # Dates with a timezone are converted to UTC, then all are made naive
+    dates = pd.to_datetime(values, errors="coerce", format="ISO8601", utc=True)
+    other = dates.isna() & values.notna()
+    if other.any():
+        dates[other] = pd.to_datetime(
+            values[other], errors="coerce", format="mixed", utc=True
+        )
+    return dates.dt.tz_localize(None)
+
+
+def parse_trades(
+    trades: pd.DataFrame, manifest, offset: int = 0
+) -> Tuple[pd.DataFrame, List[dict]]:
+    """
+    Parses and checks a batch of trade history rows, rejecting bad rows only.
+
+    Dates, numbers and types are parsed column-wise. A row is rejected when
+    its date, quantity, price or type does not parse, when its quantity is
+    not positive or its price is negative, or when the price data does not
+    know its ticker or starts after its date.
+
+    Args:
+        trades: The rows, with the TRADE_COLUMNS as strings or numbers
+        manifest: The prices Manifest
+        offset: The index of the first row in the whole upload
+
+    Returns:
+        A tuple of the accepted trades, with 'date', 'type' ('BUY' or
+        'SELL'), 'ticker', 'shares' and 'price' columns, and the rejects as
+        dicts of 'row' index and 'reason'.
+
+    Raises:
+        ValueError: If a column is missing.
+    """
+    if trades.empty and trades.columns.empty:
+        # An empty history has nothing to check, not even its fields
+        return pd.DataFrame(columns=["date", "type", "ticker", "shares", "price"]), []
+
+    missing = [column for column in TRADE_COLUMNS if column not in trades.columns]
+    if missing:
+        raise ValueError(f"Missing trade history fields: {missing}")
+
+    parsed = pd.DataFrame(
+        {
+            "date": _dates(trades["date"]),
+            "type": trades["transaction_type"].astype(str).str.strip().str.upper(),
+            "ticker": trades["symbol"].astype(str).str.strip(),
+            "shares": pd.to_numeric(trades["quantity"], errors="coerce"),
+            "price": pd.to_numeric(trades["price"], errors="coerce"),
+        }
+    )
+    parsed.index = np.arange(offset, offset + len(parsed))
+
+    reasons = pd.Series(None, index=parsed.index, dtype=object)
+    reasons[parsed["price"].isna() | (parsed["price"] < 0)] = "Invalid price"
+    reasons[parsed["shares"].isna() | (parsed["shares"] <= 0)] = "Invalid quantity"
+    reasons[~parsed["type"].isin(["BUY", "SELL"])] = "Invalid transaction type"
+    reasons[parsed["date"].isna()] = "Invalid date"
+
+    # The first day of each ticker the price data has, and why the rows of a
+    # ticker it does not cover are rejected
+    firsts, unknown, early = {}, {}, {}
+    for ticker in parsed["ticker"].unique():
+        entry = manifest.entry(ticker) if manifest.has(ticker) else None
+        if entry is None:
+            unknown[ticker] = manifest.check(ticker)
+        else:
+            firsts[ticker] = pd.Timestamp(entry["first"])
+            early[ticker] = f"No price data for ticker {ticker} before {entry['first']}"
+    valid = reasons.isna()
+    first = parsed["ticker"].map(firsts)
+    before = valid & (parsed["date"] < first)
+    reasons[before] = parsed.loc[before, "ticker"].map(early)
+    unlisted = valid & first.isna()
+    reasons[unlisted] = parsed.loc[unlisted, "ticker"].map(unknown)
+
+    rejected = reasons.notna()
+    rejects = [{"row": int(row), "reason": reason} for row, reason in reasons[rejected].items()]
+    return parsed[~rejected], rejects
+
+
+def read_trades_csv(stream: IO, chunk_rows: int = 10000) -> Iterator[pd.DataFrame]:
+    """
+    Reads a trade history CSV in chunks, without holding it all in memory.
+
+    Args:
+        stream: A binary or text stream of CSV with a header row naming the
+            TRADE_COLUMNS
+        chunk_rows: The number of rows per chunk
+
+    Returns:
+        An iterator of DataFrames of string columns.
+    """
+    return pd.read_csv(
+        stream,
+        dtype=str,
+        chunksize=chunk_rows,
+        skipinitialspace=True,
+        keep_default_na=False,
+        na_values=[""],
+    )
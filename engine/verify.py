@@ -0,0 +1,188 @@
+import sys
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from rich import print
+
+from engine import PositionLedger, ReplayEngine, parse_orders
+from prices import Prices
+
+TICKERS = ["SPY", "AAPL", "MSFT", "JNJ", "PG", "KO", "XOM", "JPM"]
+
+
+def random_orders(rng: np.random.Generator, count: int, sells: bool = True) -> list:
+    """
+    Draws a random order history that never sells more than it holds.
+
+    Args:
+        rng: The random generator
+        count: The number of orders
+        sells: False for buys only
+
+    Returns:
+        The orders as dicts, as parse_orders takes them, in date order. Some
+        share a day, and some sells close a whole position.
+    """
+    matrix = Prices.matrix()
+    rows = np.sort(rng.integers(matrix.row("2000-01-03"), len(matrix.dates), count))
+    held = dict.fromkeys(TICKERS, 0.0)
+    orders = []
+    for row in rows:
+        day = matrix.dates[row]
+        ticker = str(rng.choice(TICKERS))
+        close = matrix.closes[row, matrix.column(ticker)]
+        if sells and held[ticker] > 0 and rng.random() < 0.4:
+            order_type = "Sell"
+            shares = held[ticker] if rng.random() < 0.3 else held[ticker] * rng.random()
+            held[ticker] -= shares
+        else:
+            order_type = "Buy"
+            shares = float(rng.integers(1, 50))
+            held[ticker] += shares
+        orders.append(
+            {
+                "Date": f"{day:%Y-%m-%d}",
+                "Order_Type": order_type,
+                "Ticker": ticker,
+                "Shares": shares,
+                "Price_Per_Share": float(close) if not np.isnan(close) else 100.0,
+            }
+        )
+    return orders
+
+
+def fifo_lots(orders: pd.DataFrame) -> pd.DataFrame:
+    """
+    Closes lots first in, first out with a deque per ticker, one share count at a time.
+
+    Args:
+        orders: The orders, as parse_orders returns them
+
+    Returns:
+        The closed lots in the order they were closed, with their 'ticker',
+        'shares', 'proceeds' and 'cost_basis'.
+    """
+    queues, closed = {}, []
+    for order in orders.sort_index().sort_values("Date", kind="stable").itertuples():
+        queue = queues.setdefault(order.Ticker, deque())
+        if order.Order_Type == "buy":
+            queue.append([order.Shares, order.Price_Per_Share])
+            continue
+        remaining = order.Shares
+        while remaining > 1e-9:
+            lot = queue[0]
+            taken = min(lot[0], remaining)
+            closed.append(
+                {
+                    "ticker": order.Ticker,
+                    "shares": taken,
+                    "proceeds": taken * order.Price_Per_Share,
+                    "cost_basis": taken * lot[1],
+                }
+            )
+            lot[0] -= taken
+            remaining -= taken
+            if lot[0] <= 1e-9:
+                queue.popleft()
+    return pd.DataFrame(closed, columns=["ticker", "shares", "proceeds", "cost_basis"])
+
+
+def daily_values(orders: pd.DataFrame) -> pd.DataFrame:
+    """
+    Values the shares held of each ticker one trading day at a time.
+
+    Args:
+        orders: The orders, as parse_orders returns them
+
+    Returns:
+        A DataFrame indexed by trading day from the first order to the latest
+        price, with the shares held times the last close of each ticker.
+    """
+    matrix = Prices.matrix()
+    lo, hi = matrix.rows(orders["Date"].min(), matrix.dates[-1])
+    sign = np.where(orders["Order_Type"] == "sell", -1.0, 1.0)
+    changes = pd.DataFrame(
+        {"Date": orders["Date"], "Ticker": orders["Ticker"], "Shares": orders["Shares"] * sign}
+    )
+    columns = {}
+    for ticker in changes["Ticker"].unique():
+        own = changes[changes["Ticker"] == ticker].sort_values("Date", kind="stable")
+        days, shares = list(own["Date"]), list(own["Shares"])
+        closes = matrix.closes[lo:hi, matrix.column(ticker)]
+        held, close, values, taken = 0.0, 0.0, [], 0
+        for day, today in zip(matrix.dates[lo:hi], closes):
+            while taken < len(days) and days[taken] <= day:
+                held += shares[taken]
+                taken += 1
+            close = close if np.isnan(today) else today
+            values.append(held * close)
+        columns[ticker] = values
+    return pd.DataFrame(columns, index=matrix.dates[lo:hi])
+
+
+def verify(histories: int = 50, count: int = 60, seed: int = 0) -> dict:
+    """
+    Checks the position ledger against simple references on random histories.
+
+    Args:
+        histories: The number of random histories of each check
+        count: The number of orders per history
+        seed: The random seed
+
+    Returns:
+        A dict with, per check, the number of histories that disagree:
+        'fifo' (closed lots against a deque FIFO), 'values' (the ledger
+        valuation against shares held times close, day by day) and 'replay'
+        (the ledger and replay valuations of buys at the day's close, which
+        must agree when nothing is sold).
+    """
+    rng = np.random.default_rng(seed)
+    ledger_engine = ReplayEngine(Prices)
+    replay_engine = ReplayEngine(Prices)
+    replay_engine.set_valuation("replay")
+    failures = {"fifo": 0, "values": 0, "replay": 0}
+
+    for _ in range(histories):
+        orders = parse_orders(random_orders(rng, count))
+
+        lots = PositionLedger(orders).realized
+        expected = fifo_lots(orders)
+        fields = ["shares", "proceeds", "cost_basis"]
+        if len(lots) != len(expected) or not (
+            (lots["ticker"].to_numpy() == expected["ticker"].to_numpy()).all()
+            and np.allclose(lots[fields].to_numpy(float), expected[fields].to_numpy(float))
+        ):
+            failures["fifo"] += 1
+
+        values = ledger_engine.values(orders)
+        expected = daily_values(orders)[values.columns]
+        if not np.allclose(values.to_numpy(), expected.to_numpy(), rtol=1e-12, atol=1e-6):
+            failures["values"] += 1
+
+        buys = parse_orders(random_orders(rng, count, sells=False))
+        if not np.allclose(
+            ledger_engine.values(buys).to_numpy(),
+            replay_engine.values(buys).to_numpy(),
+            rtol=1e-9,
+        ):
+            failures["replay"] += 1
+
+    return failures
+
+
+def main():
+    if not Prices.load():
+        Prices.build()
+
+    histories = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    failures = verify(histories)
+    for check, failed in failures.items():
+        color = "red" if failed else "green"
+        print(f"[{color}][{'!' if failed else '+'}] {check}: {failed} of {histories} disagree")
+    if any(failures.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
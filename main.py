@@ -3,9 +3,13 @@ import sys
 
 from dotenv import load_dotenv
 from rich import print
+from sqlalchemy import func
 
 from database import DB
+from engine import Benchmarks, Checkpoints, Compute, Replay
+from models import Order
 from nessie import Nessie, NessieClient
+from prices import Prices, Warmup
 from server import app
 
 # Load environment variables
@@ -18,6 +22,20 @@ DB_USER = os.getenv("DB_USER")
 DB_PASS = os.getenv("DB_PASS")
 DB_NAME = os.getenv("DB_NAME")
 NESSIE_KEY = os.getenv("NESSIE_KEY")
+PRICE_CACHE_MB = os.getenv("PRICE_CACHE_MB")
+PRICE_DATASET = os.getenv("PRICE_DATASET")
+PRICE_SHARED_DIR = os.getenv("PRICE_SHARED_DIR")
+PRICE_COMPACT = os.getenv("PRICE_COMPACT")
+PORTFOLIO_REPLAY = os.getenv("PORTFOLIO_REPLAY")
+PORTFOLIO_VALUATION = os.getenv("PORTFOLIO_VALUATION")
+BENCHMARK_TICKERS = os.getenv("BENCHMARK_TICKERS")
+COMPUTE_WORKERS = os.getenv("COMPUTE_WORKERS")
+COMPUTE_TIMEOUT = os.getenv("COMPUTE_TIMEOUT")
+COMPUTE_MAX_QUEUE = os.getenv("COMPUTE_MAX_QUEUE")
+CHECKPOINT_EVERY = os.getenv("CHECKPOINT_EVERY")
+PRICE_WARMUP = os.getenv("PRICE_WARMUP")
+PRICE_WARMUP_TICKERS = os.getenv("PRICE_WARMUP_TICKERS", "SPY")
+PRICE_WARMUP_TOP = os.getenv("PRICE_WARMUP_TOP")
 
 DB_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
@@ -38,6 +56,46 @@ if __name__ == "__main__":
     except ValueError:
         DB_PORT = 5432
 
+    try:
+        if PRICE_CACHE_MB:
+            Prices.cache.set_capacity(int(PRICE_CACHE_MB) * 1024 * 1024)
+    except ValueError:
+        pass
+
+    if PRICE_DATASET:
+        Prices.set_dataset(PRICE_DATASET)
+    if PRICE_COMPACT:
+        Prices.set_compact(PRICE_COMPACT.lower() in ("1", "true", "yes"))
+    if PRICE_SHARED_DIR:
+        # "off" gives every worker its own aligned matrix
+        Prices.set_shared(None if PRICE_SHARED_DIR.lower() == "off" else PRICE_SHARED_DIR)
+
+    if PORTFOLIO_REPLAY:
+        # "legacy" replays orders one pandas update at a time
+        Replay.set_enabled(PORTFOLIO_REPLAY.lower() != "legacy")
+    if PORTFOLIO_VALUATION:
+        # "replay" values sold shares as the original per-order replay did
+        try:
+            Replay.set_valuation(PORTFOLIO_VALUATION.lower())
+        except ValueError as e:
+            print(f"[yellow][!] {e}")
+    if BENCHMARK_TICKERS:
+        Benchmarks.set_tickers([t.strip() for t in BENCHMARK_TICKERS.split(",") if t.strip()])
+
+    try:
+        # Portfolio computations run in this many worker processes, 0 inline
+        Compute.set_workers(
+            int(COMPUTE_WORKERS) if COMPUTE_WORKERS else min(4, os.cpu_count() or 1)
+        )
+        if COMPUTE_TIMEOUT:
+            Compute.set_timeout(float(COMPUTE_TIMEOUT))
+        if COMPUTE_MAX_QUEUE:
+            Compute.set_max_queue(int(COMPUTE_MAX_QUEUE))
+        if CHECKPOINT_EVERY:
+            Checkpoints.set_every(int(CHECKPOINT_EVERY))
+    except ValueError:
+        pass
+
     DB.set_url(DB_URL)
     NessieClient.set_key(NESSIE_KEY)
 
@@ -50,5 +108,36 @@ if __name__ == "__main__":
     else:
         print(f"[green][+] Connected to database '{DB_NAME}' at {DB_HOST}")
 
+    if PRICE_WARMUP:
+        # "all" warms the whole universe, "hot" only the configured tickers
+        # plus the most-held ones
+        tickers = None
+        if PRICE_WARMUP.lower() == "hot":
+            try:
+                top = int(PRICE_WARMUP_TOP or 20)
+            except ValueError:
+                top = 20
+            session = DB.create_session()
+            held = (
+                session.query(Order.ticker)
+                .group_by(Order.ticker)
+                .order_by(func.count(Order.id).desc())
+                .limit(top)
+                .all()
+            )
+            session.close()
+            tickers = [t.strip() for t in PRICE_WARMUP_TICKERS.split(",") if t.strip()]
+            tickers += [row.ticker for row in held if row.ticker not in tickers]
+        Warmup.start(tickers)
+        print(f"[green][+] Warming up price data in the background ({PRICE_WARMUP})")
+    elif PRICE_DATASET and not Prices.load():
+        print(f"[green][+] Reading prices from Parquet dataset '{PRICE_DATASET}'")
+    else:
+        if not Prices.load():
+            print("[yellow][!] Price store not compiled, compiling stockdata")
+            Prices.build()
+            Prices.load()
+        print(f"[green][+] Loaded price store with {len(Prices.tickers)} tickers")
+
     print(f"[green][+] Running on {ADDR}:{PORT}")
     app.run(debug=True, host=ADDR, port=PORT)
@@ -17,3 +17,7 @@ class Portfolio(Base):
     user = relationship("User", back_populates="portfolio")
 
     orders = relationship("Order", back_populates="portfolio")
+
+    series = relationship("PortfolioSeries", back_populates="portfolio", uselist=False)
+
+    checkpoints = relationship("PositionCheckpoint", back_populates="portfolio")
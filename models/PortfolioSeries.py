@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Date, ForeignKey, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import relationship
+
+from database.db import Base
+
+
+class PortfolioSeries(Base):
+    __tablename__ = "portfolio_series"
+
+    portfolio_id = Column(
+        UUID(as_uuid=True), ForeignKey("portfolios.id"), primary_key=True
+    )
+    portfolio = relationship("Portfolio", back_populates="series")
+
+    orders_digest = Column(String(64), nullable=False)
+    price_version = Column(String(64), nullable=False)
+    as_of = Column(Date, nullable=False)
+
+    series = Column(JSONB, nullable=False)
+    allocations = Column(JSONB, nullable=False)
+    state = Column(JSONB, nullable=False)
+
+    # Statistics of the series keyed by their parameters, cleared when it changes
+    analytics = Column(JSONB, nullable=True)
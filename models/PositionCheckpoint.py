@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import relationship
+
+from database.db import Base
+
+
+class PositionCheckpoint(Base):
+    __tablename__ = "position_checkpoints"
+
+    portfolio_id = Column(
+        UUID(as_uuid=True), ForeignKey("portfolios.id"), primary_key=True
+    )
+    portfolio = relationship("Portfolio", back_populates="checkpoints")
+
+    # After every order up to and including this date
+    date = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False)
+
+    holdings = Column(JSONB, nullable=False)
+    invested = Column(Float, nullable=False)
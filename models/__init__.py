@@ -3,6 +3,8 @@ from .Category import Category
 from .Merchant import Merchant
 from .Order import Order, OrderType
 from .Portfolio import Portfolio
+from .PortfolioSeries import PortfolioSeries
+from .PositionCheckpoint import PositionCheckpoint
 from .Transaction import Transaction, TransactionType
 from .User import (CyclicalVsDefensive, GrowthVsValue, MarketCapPreferences,
                    User, ValuationMetricsPreference)
@@ -0,0 +1,9 @@
+from .cache import FrameCache
+from .dates import from_days, to_day, to_days
+from .manifest import Manifest
+from .matrix import PriceMatrix
+from .store import COLUMNS, FIELDS, MISSING, PriceStore
+from .warmup import PriceWarmup
+
+Prices: PriceStore = PriceStore()
+Warmup: PriceWarmup = PriceWarmup(Prices)
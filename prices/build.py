@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from rich import print
+
+from prices import Prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile stockdata into a price store")
+    parser.add_argument("data_dir", nargs="?", help="The CSV directory")
+    parser.add_argument("store_dir", nargs="?", default="", help="The store directory")
+    parser.add_argument(
+        "--compact", action="store_true", help="Store integer-encoded columns"
+    )
+    args = parser.parse_args()
+
+    if args.data_dir:
+        Prices.set_paths(args.data_dir, args.store_dir)
+    Prices.set_compact(args.compact)
+
+    started = time.time()
+    count = Prices.build()
+    print(
+        f"[green][+] Compiled {count} tickers from '{Prices.data_dir}' into "
+        f"'{Prices.store_dir}' in {time.time() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
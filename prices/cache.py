@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict
+
+import numpy as np
+
+
+class FrameCache:
+    """
+    Bounded, process-wide LRU cache of parsed ticker price arrays.
+
+    Entries are keyed by ticker and remember the mtime of the file they were
+    parsed from, so an updated CSV is re-parsed on its next access.
+    """
+
+    max_bytes: int
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_capacity(self, max_bytes: int):
+        """
+        Sets the memory cap of the cache, evicting entries if needed.
+
+        Args:
+            max_bytes: The maximum total size of the cached arrays in bytes
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def get(
+        self, ticker: str, path: str, loader: Callable[[str], Dict[str, np.ndarray]]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns the cached arrays for a ticker, parsing its file on a miss.
+
+        Args:
+            ticker: The stock ticker
+            path: The file the ticker's prices are parsed from
+            loader: Parses the file into a dict of numpy arrays
+
+        Returns:
+            The ticker's arrays. They are read-only and shared between callers.
+        """
+        mtime = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(ticker)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        arrays = loader(path)
+        for values in arrays.values():
+            values.flags.writeable = False
+        nbytes = sum(values.nbytes for values in arrays.values())
+
+        with self._lock:
+            old = self._entries.pop(ticker, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[ticker] = (mtime, arrays, nbytes)
+            self.nbytes += nbytes
+            self._evict()
+
+        return arrays
+
+    def peek(self, ticker: str, path: str) -> Dict[str, np.ndarray] | None:
+        """
+        Returns the cached arrays for a ticker without parsing on a miss.
+
+        Args:
+            ticker: The stock ticker
+            path: The file the ticker's prices are parsed from
+
+        Returns:
+            The ticker's arrays, or None if they are not cached or are stale.
+        """
+        mtime = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or entry[0] != mtime:
+                return None
+            self._entries.move_to_end(ticker)
+            self.hits += 1
+            return entry[1]
+
+    def invalidate(self, ticker: str = None):
+        """
+        Drops one ticker, or every ticker, from the cache.
+
+        Args:
+            ticker: The ticker to drop, or None to clear the cache
+        """
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                self.nbytes = 0
+                return
+            old = self._entries.pop(ticker, None)
+            if old is not None:
+                self.nbytes -= old[2]
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the cap
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Returns: The hit/miss/eviction counters and current size of the cache.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,212 @@
+import os
+from typing import Dict, List
+
+import numpy as np
+
+PRICES = ("open", "high", "low", "close")
+BLOCK = 256
+MAX_DECIMALS = 6
+_WIDTHS = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def price_scale(values: np.ndarray) -> float:
+    """
+    Finds the smallest power-of-ten scale that turns prices into exact ticks.
+
+    Args:
+        values: A ticker's prices, across all price fields
+
+    Returns:
+        The scale, 10 ** decimals.
+
+    Raises:
+        ValueError: If the prices have more than MAX_DECIMALS decimals or
+            their ticks overflow int32.
+    """
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10.0**decimals
+        ticks = np.rint(values * scale)
+        if len(values) and np.abs(ticks).max() >= 2**31:
+            break
+        if np.array_equal(ticks / scale, values):
+            return scale
+    raise ValueError("Prices cannot be stored exactly as int32 ticks")
+
+
+def encode_blocks(ticks: np.ndarray, offsets: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Delta-encodes int ticks in blocks of BLOCK rows per ticker.
+
+    Every block stores its first tick as a base and the differences between
+    consecutive rows in the narrowest of int8, int16 and int32 that fits
+    them, so prices that move slowly take one or two bytes per row.
+
+    Args:
+        ticks: The int64 ticks of every ticker, concatenated
+        offsets: The per-ticker offset table into ticks
+
+    Returns:
+        A dict with the 'data' uint8 buffer and per-block 'base' ticks,
+        'width' in bytes and 'start' byte offset into the buffer.
+    """
+    chunks: List[bytes] = []
+    base, width, start = [], [], []
+    pos = 0
+    for i in range(len(offsets) - 1):
+        for lo in range(int(offsets[i]), int(offsets[i + 1]), BLOCK):
+            block = ticks[lo : min(lo + BLOCK, int(offsets[i + 1]))]
+            deltas = np.diff(block, prepend=block[0])
+            largest = int(np.abs(deltas).max())
+            size = 1 if largest < 2**7 else 2 if largest < 2**15 else 4
+            chunk = deltas.astype(_WIDTHS[size]).tobytes()
+            base.append(block[0])
+            width.append(size)
+            start.append(pos)
+            chunks.append(chunk)
+            pos += len(chunk)
+
+    return {
+        "data": np.frombuffer(b"".join(chunks), dtype=np.uint8),
+        "base": np.array(base, dtype=np.int32),
+        "width": np.array(width, dtype=np.int8),
+        "start": np.array(start, dtype=np.int64),
+    }
+
+
+def write_compact(path: str, offsets: np.ndarray, parts: Dict[str, List[np.ndarray]]):
+    """
+    Writes the compact form of a store's columns into a directory.
+
+    Days are stored as each ticker's first day plus uint16 gaps from the
+    previous trading day, prices as block-delta-encoded ticks with a
+    per-ticker scale and volumes as uint32, or uint64 if any volume does not
+    fit.
+
+    Args:
+        path: The store directory being written
+        offsets: The per-ticker offset table
+        parts: Per-ticker 'day', OHLC and 'volume' arrays, as read_csv_arrays
+            returns them
+
+    Raises:
+        ValueError: If a column cannot be stored exactly.
+    """
+    first = np.array([days[0] if len(days) else 0 for days in parts["day"]])
+    gaps = [np.diff(days, prepend=days[:1]) for days in parts["day"]]
+    day = np.concatenate(gaps) if gaps else np.zeros(0, dtype=np.int64)
+    if len(day) and (day.min() < 0 or day.max() >= 2**16):
+        raise ValueError("Trading day gaps do not fit uint16")
+    np.save(os.path.join(path, "first.npy"), first.astype(np.int32))
+    np.save(os.path.join(path, "day.npy"), day.astype(np.uint16))
+
+    scales = np.array(
+        [
+            price_scale(np.concatenate([parts[field][i] for field in PRICES]))
+            for i in range(len(offsets) - 1)
+        ]
+    )
+    np.save(os.path.join(path, "scale.npy"), scales)
+
+    for field in PRICES:
+        ticks = np.concatenate(
+            [np.rint(values * scales[i]) for i, values in enumerate(parts[field])]
+        ).astype(np.int64)
+        for name, values in encode_blocks(ticks, offsets).items():
+            np.save(os.path.join(path, f"{field}.{name}.npy"), values)
+
+    volume = np.concatenate(parts["volume"])
+    if len(volume) and (
+        volume.min() < 0 or not np.array_equal(np.rint(volume), volume)
+    ):
+        raise ValueError("Volumes are not non-negative integers")
+    dtype = np.uint32 if not len(volume) or volume.max() < 2**32 else np.uint64
+    np.save(os.path.join(path, "volume.npy"), volume.astype(dtype))
+
+
+class CompactColumns:
+    """
+    Memory-mapped compact store columns, decoded one ticker at a time.
+
+    Decoding a ticker is a handful of vectorized operations per column: a
+    cumulative sum of its day gaps and, for each price field, a cumulative
+    sum of the deltas of its blocks rebased on each block's first tick.
+    """
+
+    FILES = ["first", "day", "scale", "volume"] + [
+        f"{field}.{name}" for field in PRICES for name in ("data", "base", "width", "start")
+    ]
+
+    def __init__(self, path: str, offsets: np.ndarray):
+        self.offsets = offsets
+        self._arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in self.FILES
+        }
+        counts = -(-np.diff(offsets) // BLOCK)
+        self.blocks = np.zeros(len(offsets), dtype=np.int64)
+        self.blocks[1:] = np.cumsum(counts)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        return all(
+            os.path.exists(os.path.join(path, f"{name}.npy")) for name in cls.FILES
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self._arrays.values())
+
+    def _decode_field(self, field: str, i: int) -> np.ndarray:
+        lo, hi = int(self.blocks[i]), int(self.blocks[i + 1])
+        rows = int(self.offsets[i + 1] - self.offsets[i])
+        data = self._arrays[f"{field}.data"]
+        width = self._arrays[f"{field}.width"][lo:hi]
+        start = self._arrays[f"{field}.start"][lo:hi]
+        lengths = np.full(hi - lo, BLOCK, dtype=np.int64)
+        if hi > lo:
+            lengths[-1] = rows - BLOCK * (hi - lo - 1)
+
+        deltas = np.empty(rows, dtype=np.int64)
+        pos = 0
+        for size, begin, count in zip(width.tolist(), start.tolist(), lengths.tolist()):
+            deltas[pos : pos + count] = data[begin : begin + size * count].view(
+                _WIDTHS[size]
+            )
+            pos += count
+
+        sums = np.cumsum(deltas)
+        firsts = np.arange(hi - lo) * BLOCK
+        rebase = self._arrays[f"{field}.base"][lo:hi].astype(np.int64) - sums[firsts]
+        return sums + np.repeat(rebase, lengths)
+
+    def decode(self, i: int) -> Dict[str, np.ndarray]:
+        """
+        Decodes the full history of the i-th ticker.
+
+        Args:
+            i: The ticker's position in the store
+
+        Returns:
+            A dict with a 'day' int32 array and one float64 array per OHLCV field.
+        """
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        arrays = {
+            "day": np.cumsum(self._arrays["day"][lo:hi], dtype=np.int32)
+            + self._arrays["first"][i]
+        }
+        scale = float(self._arrays["scale"][i])
+        for field in PRICES:
+            arrays[field] = self._decode_field(field, i) / scale
+        arrays["volume"] = self._arrays["volume"][lo:hi].astype(np.float64)
+        return arrays
+
+
+def describe(path: str) -> dict:
+    """
+    Returns: The on-disk size in bytes of every compact column file.
+    """
+    return {
+        name: os.path.getsize(os.path.join(path, f"{name}.npy"))
+        for name in ["offsets", *CompactColumns.FILES]
+    }
+
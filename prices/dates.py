@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+
+def to_day(value) -> int:
+    """
+    Converts a date-like value to a day number (days since 1970-01-01).
+
+    Args:
+        value: A date string, date, datetime, pandas Timestamp or day number.
+
+    Returns:
+        The day number as an int.
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def to_days(values) -> np.ndarray:
+    """
+    Converts a sequence of date-like values to an int32 array of day numbers.
+
+    Args:
+        values: Date strings, dates, datetimes, a datetime64 array or day numbers.
+
+    Returns:
+        An int32 numpy array of day numbers.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        return values.astype(np.int32)
+    if isinstance(values, (np.ndarray, pd.DatetimeIndex)) and values.dtype.kind == "M":
+        return np.asarray(values, dtype="datetime64[D]").astype(np.int32)
+    return (
+        pd.to_datetime(pd.Index(values))
+        .values.astype("datetime64[D]")
+        .astype(np.int32)
+    )
+
+
+def from_days(days: np.ndarray) -> np.ndarray:
+    """
+    Converts an array of day numbers back to datetime64[ns] values.
+
+    Args:
+        days: An array of day numbers.
+
+    Returns:
+        A datetime64[ns] numpy array.
+    """
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[ns]")
@@ -0,0 +1,36 @@
+import os
+import sys
+
+from rich import print
+
+from prices import Prices
+from prices.store import read_csv_arrays
+
+
+def main():
+    """
+    Appends new daily bars to the price data.
+
+    Usage: python -m prices.ingest <TICKER>.csv [<TICKER>.csv ...]
+
+    Each file holds new rows for one ticker, in the stockdata CSV format, and
+    is named after that ticker. Running servers pick the bars up within a
+    second without restarting.
+    """
+    if len(sys.argv) < 2:
+        print("[red][!] Usage: python -m prices.ingest <TICKER>.csv [...]")
+        sys.exit(1)
+
+    bars = {}
+    for path in sys.argv[1:]:
+        ticker = os.path.splitext(os.path.basename(path))[0].upper()
+        bars[ticker] = read_csv_arrays(path)
+
+    Prices.load()
+    appended = Prices.append(bars)
+    for ticker, count in appended.items():
+        print(f"[green][+] {ticker}: appended {count} bars")
+
+
+if __name__ == "__main__":
+    main()
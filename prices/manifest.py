@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List
+
+from .dates import to_day
+
+
+def scan_csv(path: str) -> dict:
+    """
+    Summarizes a stockdata CSV without parsing it.
+
+    Args:
+        path: The path to the CSV file
+
+    Returns:
+        A dict with the 'first' and 'last' dates, the number of 'rows', the
+        sha256 'checksum' of the file and its 'size' and 'mtime_ns'.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    lines = [line for line in data.split(b"\n")[1:] if line.strip()]
+    return {
+        "first": lines[0][:10].decode() if lines else None,
+        "last": lines[-1][:10].decode() if lines else None,
+        "rows": len(lines),
+        "checksum": hashlib.sha256(data).hexdigest(),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+class Manifest:
+    """
+    The ticker universe of stockdata/, with each ticker's date coverage.
+
+    The manifest is built once by scanning every CSV and saved next to them,
+    so checking whether a ticker exists and covers a date never loads price
+    data. Tickers that get new bars are rescanned individually, CSVs changed
+    on disk are rescanned when a process first loads the manifest or the
+    store is compiled, and other processes reload the saved manifest when it
+    changes.
+    """
+
+    refresh_interval = 1.0
+
+    def __init__(self, data_dir: str = "stockdata"):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, ".manifest.json")
+        self.entries: Dict[str, dict] = {}
+        self._days: Dict[str, tuple] = {}
+        self._mtime = 0
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _set_entries(self, entries: Dict[str, dict]):
+        self.entries = entries
+        self._days = {
+            ticker: (to_day(entry["first"]), to_day(entry["last"]))
+            for ticker, entry in entries.items()
+            if entry["rows"]
+        }
+
+    def _save(self):
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump({"tickers": self.entries}, f)
+        os.replace(f"{self.path}.tmp", self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def build(self) -> int:
+        """
+        Scans every CSV in the data directory and saves the manifest.
+
+        Returns:
+            The number of tickers in the manifest.
+        """
+        entries = {
+            name[: -len(".csv")]: scan_csv(os.path.join(self.data_dir, name))
+            for name in sorted(os.listdir(self.data_dir))
+            if name.endswith(".csv")
+        }
+        with self._lock:
+            self._set_entries(entries)
+            self._save()
+        return len(entries)
+
+    def refresh(self) -> int:
+        """
+        Rescans the CSVs that changed on disk since they were scanned.
+
+        A CSV whose size or modification time differs from its entry is
+        rescanned, new CSVs are added and removed ones dropped, and the
+        manifest is saved if anything changed.
+
+        Returns:
+            The number of tickers rescanned, added or dropped.
+        """
+        if not self._mtime:
+            self.load()
+        names = {
+            name[: -len(".csv")]
+            for name in os.listdir(self.data_dir)
+            if name.endswith(".csv")
+        }
+        with self._lock:
+            entries = {ticker: self.entries[ticker] for ticker in names & set(self.entries)}
+            changed = len(self.entries) - len(entries)
+            for ticker in sorted(names):
+                path = os.path.join(self.data_dir, f"{ticker}.csv")
+                entry = entries.get(ticker)
+                if entry is not None:
+                    stat = os.stat(path)
+                    if (
+                        entry.get("size") == stat.st_size
+                        and entry.get("mtime_ns") == stat.st_mtime_ns
+                    ):
+                        continue
+                entries[ticker] = scan_csv(path)
+                changed += 1
+            if changed:
+                self._set_entries(entries)
+                self._save()
+        return changed
+
+    def load(self) -> bool:
+        """
+        Loads the saved manifest.
+
+        Returns: True if it was loaded, False if it has not been built.
+        """
+        self._checked = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path) as f:
+                entries = json.load(f)["tickers"]
+        except (OSError, ValueError, KeyError):
+            return False
+        with self._lock:
+            self._set_entries(entries)
+            self._mtime = mtime
+        return True
+
+    def _ensure_loaded(self):
+        if not self._mtime:
+            # CSVs may have been replaced since another process saved it
+            if self.load():
+                self.refresh()
+            else:
+                self.build()
+        elif time.monotonic() - self._checked > self.refresh_interval:
+            self._checked = time.monotonic()
+            try:
+                if os.stat(self.path).st_mtime_ns != self._mtime:
+                    self.load()
+            except OSError:
+                pass
+
+    def update(self, tickers: Iterable[str]):
+        """
+        Rescans the CSVs of some tickers, e.g. after bars were appended.
+
+        Args:
+            tickers: The tickers whose CSV changed
+        """
+        self._ensure_loaded()
+        with self._lock:
+            entries = dict(self.entries)
+            for ticker in tickers:
+                entries[ticker] = scan_csv(os.path.join(self.data_dir, f"{ticker}.csv"))
+            self._set_entries(entries)
+            self._save()
+
+    @property
+    def tickers(self) -> List[str]:
+        """
+        Returns: The sorted list of tickers in the manifest.
+        """
+        self._ensure_loaded()
+        return sorted(self.entries)
+
+    def has(self, ticker: str) -> bool:
+        """
+        Args:
+            ticker: The stock ticker
+
+        Returns: True if the ticker has at least one bar.
+        """
+        self._ensure_loaded()
+        return ticker in self._days
+
+    def entry(self, ticker: str) -> dict | None:
+        """
+        Args:
+            ticker: The stock ticker
+
+        Returns: The ticker's manifest entry, or None if it is unknown.
+        """
+        self._ensure_loaded()
+        return self.entries.get(ticker)
+
+    def check(self, ticker: str, start=None, end=None) -> str | None:
+        """
+        Checks that a ticker exists and has bars over a date range.
+
+        Args:
+            ticker: The stock ticker
+            start: The first date that needs a price, unchecked if None
+            end: The last date that needs a price, unchecked if None
+
+        Returns:
+            None if the ticker covers the range, otherwise why it does not.
+        """
+        self._ensure_loaded()
+        days = self._days.get(ticker)
+        if days is None:
+            return f"Unknown ticker {ticker}"
+        first, last = days
+        if start is not None and to_day(start) < first:
+            return (
+                f"No price data for ticker {ticker} before "
+                f"{self.entries[ticker]['first']}"
+            )
+        if end is not None and to_day(end) > last:
+            return (
+                f"No price data for ticker {ticker} after "
+                f"{self.entries[ticker]['last']}"
+            )
+        return None
+
+    def validate(self, tickers: Iterable[str], start=None, end=None):
+        """
+        Checks that every ticker exists and has bars over a date range.
+
+        Args:
+            tickers: The stock tickers
+            start: The first date that needs a price, unchecked if None
+            end: The last date that needs a price, unchecked if None
+
+        Raises:
+            ValueError: If a ticker is unknown or does not cover the range.
+        """
+        for ticker in tickers:
+            error = self.check(ticker, start, end)
+            if error is not None:
+                raise ValueError(error)
+
+
+def main():
+    from rich import print
+
+    manifest = Manifest(*sys.argv[1:2])
+    started = time.time()
+    count = manifest.build()
+    print(
+        f"[green][+] Wrote manifest of {count} tickers to '{manifest.path}' "
+        f"in {time.time() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dates import from_days, to_day
+
+
+class PriceMatrix:
+    """
+    Dense close-price matrix of the whole universe on a shared trading calendar.
+
+    Rows are the master calendar (every day on which any ticker traded) and
+    columns are tickers. Days a ticker did not trade, including days before
+    its listing, are NaN.
+    """
+
+    calendar: np.ndarray
+    closes: np.ndarray
+    tickers: List[str]
+    columns: Dict[str, int]
+
+    def __init__(self, calendar: np.ndarray, closes: np.ndarray, tickers: List[str]):
+        self.calendar = calendar
+        self.closes = closes
+        self.tickers = tickers
+        self.columns = {ticker: j for j, ticker in enumerate(tickers)}
+        self.dates = pd.DatetimeIndex(from_days(calendar), name="Date")
+
+    @classmethod
+    def build(cls, store) -> "PriceMatrix":
+        """
+        Aligns every ticker in a price store on the master trading calendar.
+
+        Args:
+            store: The PriceStore to read the universe from
+
+        Returns:
+            The aligned PriceMatrix.
+        """
+        tickers = store.tickers
+        history = [store.arrays(ticker) for ticker in tickers]
+
+        calendar = np.unique(np.concatenate([arrays["day"] for arrays in history]))
+        closes = np.full((len(calendar), len(tickers)), np.nan)
+        for j, arrays in enumerate(history):
+            closes[np.searchsorted(calendar, arrays["day"]), j] = arrays["close"]
+
+        return cls(calendar.astype(np.int32), closes, tickers)
+
+    def extended(self, changed: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> "PriceMatrix":
+        """
+        Adds newly ingested closes without realigning the whole universe.
+
+        If no new day or ticker appears the closes are filled in place,
+        otherwise (or if the matrix is a read-only shared segment) the
+        existing matrix is copied once into a new one.
+
+        Args:
+            changed: A dict mapping tickers to their new (days, closes)
+
+        Returns:
+            The matrix including the new closes.
+        """
+        new_days = np.concatenate([days for days, _ in changed.values()])
+        calendar = np.union1d(self.calendar, new_days).astype(np.int32)
+        tickers = self.tickers + [t for t in changed if t not in self.columns]
+
+        if (
+            len(calendar) == len(self.calendar)
+            and len(tickers) == len(self.tickers)
+            and self.closes.flags.writeable
+        ):
+            closes = self.closes
+        else:
+            closes = np.full((len(calendar), len(tickers)), np.nan)
+            rows = np.searchsorted(calendar, self.calendar)
+            closes[rows, : len(self.tickers)] = self.closes
+
+        matrix = PriceMatrix(calendar, closes, tickers)
+        for ticker, (days, values) in changed.items():
+            closes[np.searchsorted(calendar, days), matrix.columns[ticker]] = values
+        return matrix
+
+    def column(self, ticker: str) -> int:
+        """
+        Args:
+            ticker: The stock ticker
+
+        Returns: The ticker's column in the matrix.
+
+        Raises:
+            ValueError: If there is no price data for the ticker.
+        """
+        j = self.columns.get(ticker)
+        if j is None:
+            raise ValueError(f"No price data for ticker {ticker}")
+        return j
+
+    def row(self, date) -> int:
+        """
+        Args:
+            date: A date
+
+        Returns: The row of the first trading day on or after the date.
+        """
+        return int(np.searchsorted(self.calendar, to_day(date), "left"))
+
+    def rows(self, start=None, end=None) -> Tuple[int, int]:
+        """
+        Finds the calendar rows within [start, end].
+
+        Args:
+            start: The first date to include, unbounded if None
+            end: The last date to include, unbounded if None
+
+        Returns:
+            A (lo, hi) tuple to slice the matrix rows with.
+        """
+        lo = 0 if start is None else self.row(start)
+        hi = (
+            len(self.calendar)
+            if end is None
+            else int(np.searchsorted(self.calendar, to_day(end), "right"))
+        )
+        return lo, max(lo, hi)
+
+    def gather(self, tickers: Sequence[str], start=None, end=None) -> np.ndarray:
+        """
+        Gathers the closes of some tickers between two dates.
+
+        Args:
+            tickers: The stock tickers, one per output column
+            start: The first date to include, unbounded if None
+            end: The last date to include, unbounded if None
+
+        Returns:
+            A float64 array of shape (days, len(tickers)).
+        """
+        lo, hi = self.rows(start, end)
+        return self.closes[lo:hi, [self.column(ticker) for ticker in tickers]]
+
+    def frame(self, tickers: Sequence[str], start=None, end=None) -> pd.DataFrame:
+        """
+        Returns the closes of some tickers between two dates as a DataFrame.
+
+        Args:
+            tickers: The stock tickers
+            start: The first date to include, unbounded if None
+            end: The last date to include, unbounded if None
+
+        Returns:
+            A DataFrame indexed by trading day with one column per ticker.
+        """
+        lo, hi = self.rows(start, end)
+        return pd.DataFrame(
+            self.gather(tickers, start, end),
+            index=self.dates[lo:hi],
+            columns=list(tickers),
+        )
+
+    def value(self, holdings: Dict[str, float], start=None, end=None) -> np.ndarray:
+        """
+        Values a fixed set of holdings on every trading day between two dates.
+
+        Args:
+            holdings: A dict mapping tickers to share counts
+            start: The first date to include, unbounded if None
+            end: The last date to include, unbounded if None
+
+        Returns:
+            The daily value of the holdings. Tickers without a close on a day
+            contribute nothing to that day.
+        """
+        prices = np.nan_to_num(self.gather(list(holdings), start, end))
+        return prices @ np.fromiter(holdings.values(), dtype=np.float64)
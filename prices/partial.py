@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .dates import to_day, to_days
+
+
+def build_index(path: str) -> dict:
+    """
+    Scans a stockdata CSV for the byte offset at which each month starts.
+
+    Args:
+        path: The path to the CSV file
+
+    Returns:
+        A dict with the CSV's header columns and a 'months' dict mapping
+        'YYYY-MM' to the offset of that month's first row.
+    """
+    months = {}
+    with open(path, "rb") as f:
+        header = f.readline()
+        pos = len(header)
+        for line in f:
+            month = line[:7].decode()
+            if month not in months:
+                months[month] = pos
+            pos += len(line)
+
+    return {
+        "columns": header.decode().strip().split(","),
+        "months": months,
+    }
+
+
+class PartialReader:
+    """
+    Reads a date range of a stockdata CSV without parsing the whole file.
+
+    Each CSV gets a sidecar index mapping months to byte offsets, so a read
+    seeks straight to the first requested month and parses only the Date and
+    Close columns of the rows in range.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def index(self, path: str, index_path: str) -> dict:
+        """
+        Returns the month index of a CSV, rebuilding its sidecar if stale.
+
+        Args:
+            path: The path to the CSV file
+            index_path: The path to the CSV's sidecar index
+
+        Returns:
+            The index, as built by build_index, plus the sorted 'keys' of its
+            months and the file 'size'.
+        """
+        stat = os.stat(path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            cached = self._indexes.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        index = None
+        try:
+            with open(index_path) as f:
+                sidecar = json.load(f)
+            if (sidecar["size"], sidecar["mtime_ns"]) == stamp:
+                index = sidecar
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if index is None:
+            index = build_index(path)
+            index["size"], index["mtime_ns"] = stamp
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(f"{index_path}.tmp", "w") as f:
+                json.dump(index, f)
+            os.replace(f"{index_path}.tmp", index_path)
+
+        index["keys"] = sorted(index["months"])
+        with self._lock:
+            self._indexes[path] = (stamp, index)
+        return index
+
+    def read(
+        self, path: str, index_path: str, start=None, end=None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Parses the closes of a CSV between two dates.
+
+        Args:
+            path: The path to the CSV file
+            index_path: The path to the CSV's sidecar index
+            start: The first date to include, unbounded if None
+            end: The last date to include, unbounded if None
+
+        Returns:
+            A dict with a sorted 'day' int32 array and a 'close' float64 array.
+        """
+        index = self.index(path, index_path)
+        keys, months = index["keys"], index["months"]
+
+        i = 0 if start is None else bisect_left(keys, _month(start))
+        j = len(keys) if end is None else bisect_right(keys, _month(end))
+        begin = months[keys[i]] if i < len(keys) else index["size"]
+        stop = months[keys[j]] if j < len(keys) else index["size"]
+
+        if stop <= begin:
+            return {
+                "day": np.zeros(0, dtype=np.int32),
+                "close": np.zeros(0, dtype=np.float64),
+            }
+
+        with open(path, "rb") as f:
+            f.seek(begin)
+            chunk = f.read(stop - begin)
+
+        date_col = index["columns"].index("Date")
+        close_col = index["columns"].index("Close")
+        df = pd.read_csv(
+            io.BytesIO(chunk),
+            header=None,
+            usecols=[date_col, close_col],
+            dtype={close_col: np.float64},
+        )
+        days = to_days(df[date_col])
+        closes = df[close_col].to_numpy(dtype=np.float64)
+
+        # Trim the partial months at either end of the range
+        lo = 0 if start is None else int(np.searchsorted(days, to_day(start), "left"))
+        hi = (
+            len(days)
+            if end is None
+            else int(np.searchsorted(days, to_day(end), "right"))
+        )
+        return {"day": days[lo:hi], "close": closes[lo:hi]}
+
+
+def _month(value) -> str:
+    return str(np.datetime64(to_day(value), "D"))[:7]
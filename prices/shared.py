@@ -0,0 +1,156 @@
+import json
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .matrix import PriceMatrix
+
+MAGIC = b"PRICESEG"
+ALIGN = 64
+
+
+def segment_path(directory: str, version: str) -> str:
+    return os.path.join(directory, f"matrix-{version}.seg")
+
+
+def _version_key(name: str) -> Tuple[int, int] | None:
+    # "matrix-<built_ms>-<delta_rows>.seg" -> (built_ms, delta_rows)
+    if not (name.startswith("matrix-") and name.endswith(".seg")):
+        return None
+    try:
+        built, rows = name[len("matrix-") : -len(".seg")].split("-")
+        return int(built), int(rows)
+    except ValueError:
+        return None
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def write_segment(matrix: PriceMatrix, path: str):
+    """
+    Writes a price matrix to a flat file that every process can map read-only.
+
+    The file starts with a magic, the length of a JSON header describing the
+    arrays and the header itself, followed by the raw arrays each aligned to
+    64 bytes. It is written under a temporary name and renamed into place, so
+    a process never maps a half-written segment.
+
+    Args:
+        matrix: The aligned PriceMatrix
+        path: The segment file to write
+    """
+    arrays = {
+        "calendar": np.ascontiguousarray(matrix.calendar, dtype=np.int32),
+        "closes": np.ascontiguousarray(matrix.closes, dtype=np.float64),
+    }
+
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = {
+            "dtype": values.dtype.str,
+            "shape": list(values.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + values.nbytes)
+
+    header = json.dumps({"tickers": matrix.tickers, "arrays": layout}).encode()
+    start = _aligned(len(MAGIC) + 8 + len(header))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, values in arrays.items():
+            f.seek(start + layout[name]["offset"])
+            f.write(values.tobytes())
+        f.truncate(start + offset)
+    os.replace(tmp_path, path)
+
+
+def attach_segment(path: str) -> PriceMatrix:
+    """
+    Maps a segment written by write_segment as a read-only PriceMatrix.
+
+    The matrix arrays are views into the mapping, so every process attached
+    to the same segment shares one copy of it in the page cache.
+
+    Args:
+        path: The segment file
+
+    Returns:
+        The PriceMatrix backed by the segment.
+
+    Raises:
+        ValueError: If the file is not a price matrix segment.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a price matrix segment: {path}")
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size))
+    start = _aligned(len(MAGIC) + 8 + size)
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays: Dict[str, np.ndarray] = {}
+    for name, spec in header["arrays"].items():
+        arrays[name] = np.ndarray(
+            tuple(spec["shape"]),
+            dtype=np.dtype(spec["dtype"]),
+            buffer=buffer,
+            offset=start + spec["offset"],
+        )
+
+    return PriceMatrix(arrays["calendar"], arrays["closes"], header["tickers"])
+
+
+def publish(matrix: PriceMatrix, directory: str, version: str) -> PriceMatrix:
+    """
+    Shares a matrix under its price data version and attaches to it.
+
+    Segments of older versions in the directory are removed; processes that
+    still map them keep their pages until they attach to the new one.
+
+    Args:
+        matrix: The aligned PriceMatrix
+        directory: The directory holding the segments
+        version: The price data version the matrix was built from
+
+    Returns:
+        The matrix backed by the shared segment.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = segment_path(directory, version)
+    write_segment(matrix, path)
+
+    current = _version_key(os.path.basename(path))
+    for entry in os.scandir(directory):
+        key = _version_key(entry.name)
+        if key is not None and current is not None and key < current:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    return attach_segment(path)
+
+
+def attach(directory: str, version: str) -> PriceMatrix | None:
+    """
+    Attaches to the segment another process published for a version.
+
+    Args:
+        directory: The directory holding the segments
+        version: The price data version
+
+    Returns:
+        The shared PriceMatrix, or None if no process has published it yet.
+    """
+    try:
+        return attach_segment(segment_path(directory, version))
+    except (OSError, ValueError):
+        return None
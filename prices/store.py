@@ -0,0 +1,863 @@
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import shared
+from .cache import FrameCache
+from .compact import CompactColumns, write_compact
+from .dates import from_days, to_day, to_days
+from .manifest import Manifest
+from .matrix import PriceMatrix
+from .partial import PartialReader
+
+FIELDS = ("open", "high", "low", "close", "volume")
+COLUMNS = ("day",) + FIELDS + ("cumlog",)
+MISSING = ("nan", "previous", "next")
+
+
+def cumulative_log_returns(closes: np.ndarray) -> np.ndarray:
+    """
+    Computes log(close[i] / close[0]) for a ticker's closes.
+
+    The growth factor between any two days is then the exponential of the
+    difference of their entries.
+
+    Args:
+        closes: A ticker's closes in day order.
+
+    Returns:
+        A float64 array of cumulative log returns.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log(np.asarray(closes, dtype=np.float64))
+    if len(logs) == 0:
+        return logs
+    return logs - logs[0]
+
+
+@contextmanager
+def _locked(path: str):
+    # An exclusive lock on a file, held across processes
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_csv_arrays(path: str) -> Dict[str, np.ndarray]:
+    """
+    Parses a stockdata CSV into columnar numpy arrays.
+
+    Args:
+        path: The path to the CSV file.
+
+    Returns:
+        A dict with a 'day' int32 array, one float64 array per OHLCV field and
+        the 'cumlog' cumulative log returns of the closes.
+    """
+    df = pd.read_csv(
+        path,
+        dtype={
+            "Open": np.float64,
+            "High": np.float64,
+            "Low": np.float64,
+            "Close": np.float64,
+            "Volume": np.float64,
+        },
+    )
+    arrays = {"day": to_days(df["Date"])}
+    for field in FIELDS:
+        arrays[field] = df[field.capitalize()].to_numpy(dtype=np.float64)
+    arrays["cumlog"] = cumulative_log_returns(arrays["close"])
+    return arrays
+
+
+def append_csv(path: str, rows: Dict[str, np.ndarray]):
+    """
+    Appends bars to a stockdata CSV in its existing format.
+
+    Args:
+        path: The path to the CSV file, created with a header if missing
+        rows: Columnar bars with a 'day' array and one array per OHLCV field
+    """
+    lines = []
+    if not os.path.exists(path):
+        lines.append("Date,Open,High,Low,Close,Volume\n")
+    else:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines.append("\n")
+
+    dates = from_days(rows["day"]).astype("datetime64[D]").astype(str)
+    for i, date in enumerate(dates):
+        lines.append(
+            f"{date},{rows['open'][i]:.4f},{rows['high'][i]:.4f},"
+            f"{rows['low'][i]:.4f},{rows['close'][i]:.4f},{int(rows['volume'][i])}\n"
+        )
+
+    with open(path, "a") as f:
+        f.writelines(lines)
+
+
+class PriceStore:
+    """
+    Columnar, memory-mapped store of the daily OHLCV data in stockdata/.
+
+    The store is compiled once from the CSVs into one flat array per column
+    plus a per-ticker offset table, so a ticker's history is the slice
+    offsets[i]:offsets[i + 1] of every column. Until a store is compiled,
+    tickers are parsed from their CSVs through a shared LRU cache, and
+    date-range reads of closes only parse the requested rows.
+
+    A compact store keeps days as gaps, prices as block-delta-encoded int
+    ticks and volumes as uint32, so the whole universe stays small enough to
+    remain resident; tickers are then decoded into the LRU cache on access.
+
+    A Parquet dataset written by prices.parquet can stand in for the CSVs
+    when no store is compiled.
+
+    Bars ingested after the store was compiled are kept as small per-ticker
+    delta files next to it. Every process picks them up through refresh(),
+    which is also run at most once per refresh_interval seconds on access.
+    Without a compiled store, bars are only appended to the CSVs, and other
+    processes neither see the new version nor drop their cached matrix:
+    serving from CSVs is meant for a single process, compile the store to run
+    several workers.
+
+    With a compiled store the aligned matrix is published as a segment file
+    named after the data version, so server workers map one shared copy
+    instead of each aligning their own.
+    """
+
+    data_dir: str
+    store_dir: str
+    shared_dir: str | None
+    compact = False
+    loaded = False
+    refresh_interval = 1.0
+
+    def __init__(self, data_dir: str = "stockdata", store_dir: str = ""):
+        self.data_dir = data_dir
+        self.store_dir = store_dir or os.path.join(data_dir, ".store")
+        self.shared_dir = ""
+        self.meta = {}
+        self._tickers: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._compact: CompactColumns | None = None
+        self._meta_path = ""
+        self._load_attempted = False
+        self._matrix: PriceMatrix | None = None
+        self._matrix_lock = threading.RLock()
+        self._merged: Dict[str, Dict[str, np.ndarray]] = {}
+        self._delta_mtimes: Dict[str, int] = {}
+        self._delta_rows = 0
+        self._meta_mtime = 0
+        self._checked = 0.0
+        self._ingested = 0
+        self.cache = FrameCache()
+        self.manifest = Manifest(data_dir)
+        self.partial = PartialReader()
+        self.dataset = None
+
+    def set_paths(self, data_dir: str, store_dir: str = ""):
+        """
+        Sets the CSV directory and the compiled store directory.
+
+        Args:
+            data_dir: The directory holding one <TICKER>.csv per ticker
+            store_dir: The compiled store directory, defaults to <data_dir>/.store
+        """
+        self.data_dir = data_dir
+        self.store_dir = store_dir or os.path.join(data_dir, ".store")
+        self.loaded = False
+        self._load_attempted = False
+        self._matrix = None
+        self.manifest = Manifest(data_dir)
+        self.cache.invalidate()
+
+    def set_compact(self, compact: bool):
+        """
+        Sets whether build() compiles the compact integer-encoded store.
+
+        Args:
+            compact: True for the compact store, False for float64 columns
+        """
+        self.compact = compact
+
+    def set_shared(self, directory: str | None):
+        """
+        Sets where the aligned matrix is shared between processes.
+
+        Args:
+            directory: The segment directory, e.g. a tmpfs like /dev/shm. An
+                empty string uses the store directory and None disables
+                sharing, so each process aligns its own matrix.
+        """
+        self.shared_dir = directory
+        with self._matrix_lock:
+            self._matrix = None
+
+    def _segment_dir(self) -> str | None:
+        if not self.loaded or self.shared_dir is None:
+            return None
+        return self.shared_dir or self.store_dir
+
+    def _share(self, matrix: PriceMatrix) -> PriceMatrix:
+        directory = self._segment_dir()
+        if directory is None:
+            return matrix
+        try:
+            return shared.publish(matrix, directory, self.version)
+        except OSError:
+            return matrix
+
+    def set_dataset(self, path: str):
+        """
+        Reads prices from a Parquet dataset when no store is compiled.
+
+        This needs pyarrow, which is only imported once a dataset is set.
+
+        Args:
+            path: A dataset directory written by prices.parquet
+        """
+        from .parquet import ParquetSource
+
+        self.dataset = ParquetSource(path)
+        self._matrix = None
+        self.cache.invalidate()
+
+    def csv_path(self, ticker: str) -> str:
+        return os.path.join(self.data_dir, f"{ticker}.csv")
+
+    def index_path(self, ticker: str) -> str:
+        return os.path.join(self.data_dir, ".index", f"{ticker}.json")
+
+    def delta_path(self, ticker: str) -> str:
+        return os.path.join(self.store_dir, "delta", f"{ticker}.npz")
+
+    def build(self) -> int:
+        """
+        Compiles every CSV in the data directory into the binary store.
+
+        The store is written to a temporary directory and swapped into place,
+        so running processes keep reading the previous files until they reload.
+        The manifest entries of CSVs that changed are rescanned too.
+
+        Returns:
+            The number of tickers compiled.
+
+        Raises:
+            ValueError: If a compact store cannot hold the data exactly.
+        """
+        tickers = sorted(
+            name[: -len(".csv")]
+            for name in os.listdir(self.data_dir)
+            if name.endswith(".csv")
+        )
+
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in COLUMNS}
+        offsets = np.zeros(len(tickers) + 1, dtype=np.int64)
+
+        for i, ticker in enumerate(tickers):
+            arrays = read_csv_arrays(self.csv_path(ticker))
+            for name, values in arrays.items():
+                parts[name].append(values)
+            offsets[i + 1] = offsets[i] + len(arrays["day"])
+
+        # Each build writes its own directory, so concurrent builds (the
+        # warmup of several workers, say) do not clear each other's output
+        parent = os.path.dirname(os.path.abspath(self.store_dir))
+        name = os.path.basename(self.store_dir)
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f"{name}.", suffix=".tmp", dir=parent)
+        os.chmod(tmp_dir, 0o755)
+        old_dir = None
+        try:
+            np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+            if self.compact:
+                write_compact(tmp_dir, offsets, parts)
+            else:
+                np.save(
+                    os.path.join(tmp_dir, "day.npy"),
+                    np.concatenate(parts["day"]).astype(np.int32),
+                )
+                for column in COLUMNS[1:]:
+                    np.save(
+                        os.path.join(tmp_dir, f"{column}.npy"),
+                        np.concatenate(parts[column]).astype(np.float64),
+                    )
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(
+                    {
+                        "tickers": tickers,
+                        "rows": int(offsets[-1]),
+                        "built": time.time(),
+                        "format": "compact" if self.compact else "columns",
+                    },
+                    f,
+                )
+
+            # A directory cannot be replaced atomically, so builds swap theirs
+            # in one at a time
+            with _locked(f"{self.store_dir}.lock"):
+                if os.path.isdir(self.store_dir):
+                    old_dir = tempfile.mkdtemp(prefix=f"{name}.", suffix=".old", dir=parent)
+                    os.rename(self.store_dir, os.path.join(old_dir, name))
+                os.rename(tmp_dir, self.store_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if old_dir is not None:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+        # Replaced CSVs change the dates the manifest validates against
+        self.manifest.refresh()
+        return len(tickers)
+
+    def load(self) -> bool:
+        """
+        Memory-maps the compiled store.
+
+        Returns: True if the store was loaded, False if it has not been compiled.
+        """
+        self._load_attempted = True
+        meta_path = os.path.join(self.store_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            self.loaded = False
+            return False
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        offsets_path = os.path.join(self.store_dir, "offsets.npy")
+        paths = {name: os.path.join(self.store_dir, f"{name}.npy") for name in COLUMNS}
+        if meta.get("format") == "compact":
+            ready = CompactColumns.exists(self.store_dir)
+        else:
+            ready = all(os.path.exists(path) for path in paths.values())
+        # Stores compiled before a column was added need to be recompiled
+        if not ready or not os.path.exists(offsets_path):
+            self.loaded = False
+            return False
+
+        offsets = np.load(offsets_path)
+        columns, compact = {}, None
+        if meta.get("format") == "compact":
+            compact = CompactColumns(self.store_dir, offsets)
+        else:
+            columns = {name: np.load(path, mmap_mode="r") for name, path in paths.items()}
+
+        self.meta = meta
+        self._tickers = meta["tickers"]
+        self._index = {ticker: i for i, ticker in enumerate(self._tickers)}
+        self._offsets = offsets
+        self._columns = columns
+        self._compact = compact
+        self._meta_path = meta_path
+        self._merged = {}
+        self._delta_mtimes = {}
+        self._delta_rows = 0
+        self._meta_mtime = os.stat(meta_path).st_mtime_ns
+        self._checked = time.monotonic()
+        self.loaded = True
+        self._read_deltas()
+        with self._matrix_lock:
+            self._matrix = None
+        return True
+
+    def _ensure_loaded(self):
+        if not self.loaded and not self._load_attempted:
+            self.load()
+        elif self.loaded and time.monotonic() - self._checked > self.refresh_interval:
+            self.refresh()
+
+    @property
+    def version(self) -> str:
+        """
+        Returns: An identifier of the price data that changes whenever bars are
+            added, and is the same in every process reading the same compiled
+            store. Without one it only counts this process's appends.
+        """
+        self._ensure_loaded()
+        if self.loaded:
+            return f"{self.meta['built'] * 1000:.0f}-{self._delta_rows}"
+        return f"csv.{self._ingested}"
+
+    def _base_arrays(self, ticker: str) -> Dict[str, np.ndarray]:
+        i = self._index.get(ticker)
+        if i is None:
+            return {
+                name: np.zeros(0, dtype=np.int32 if name == "day" else np.float64)
+                for name in COLUMNS
+            }
+        if self._compact is not None:
+            return self.cache.get(ticker, self._meta_path, lambda _: self._decode(i))
+        lo, hi = self._offsets[i], self._offsets[i + 1]
+        return {name: column[lo:hi] for name, column in self._columns.items()}
+
+    def _decode(self, i: int) -> Dict[str, np.ndarray]:
+        arrays = self._compact.decode(i)
+        arrays["cumlog"] = cumulative_log_returns(arrays["close"])
+        return arrays
+
+    def _read_deltas(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Merges new or updated delta files into the compiled history.
+
+        Returns:
+            A dict mapping each changed ticker to its new (days, closes).
+        """
+        delta_dir = os.path.join(self.store_dir, "delta")
+        if not os.path.isdir(delta_dir):
+            return {}
+
+        changed = {}
+        for entry in os.scandir(delta_dir):
+            if not entry.name.endswith(".npz"):
+                continue
+            ticker = entry.name[: -len(".npz")]
+            mtime = entry.stat().st_mtime_ns
+            if self._delta_mtimes.get(ticker) == mtime:
+                continue
+
+            with np.load(entry.path) as delta:
+                rows = {name: delta[name] for name in delta.files}
+            base = self._base_arrays(ticker)
+            previous = self._merged.get(ticker, base)
+            merged = {
+                name: np.concatenate([base[name], rows[name]]) for name in rows
+            }
+            merged["cumlog"] = cumulative_log_returns(merged["close"])
+
+            new = len(merged["day"]) - len(previous["day"])
+            self._delta_rows += new
+            self._merged[ticker] = merged
+            self._delta_mtimes[ticker] = mtime
+            if new > 0:
+                changed[ticker] = (merged["day"][-new:], merged["close"][-new:])
+
+        return changed
+
+    def refresh(self) -> List[str]:
+        """
+        Picks up a recompiled store or bars ingested by any process.
+
+        Only the tickers that changed are re-read, and the aligned matrix is
+        extended in place of a rebuild.
+
+        Returns:
+            The tickers that changed.
+        """
+        self._checked = time.monotonic()
+        if not self.loaded:
+            return []
+
+        try:
+            meta_mtime = os.stat(os.path.join(self.store_dir, "meta.json")).st_mtime_ns
+        except OSError:
+            return []
+        if meta_mtime != self._meta_mtime:
+            self.load()
+            self.cache.invalidate()
+            return self.tickers
+
+        changed = self._read_deltas()
+        self._apply(changed)
+        return list(changed)
+
+    def _apply(self, changed: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        if not changed:
+            return
+        with self._matrix_lock:
+            if self._matrix is not None:
+                self._matrix = self._share(self._matrix.extended(changed))
+        for ticker in changed:
+            self.cache.invalidate(ticker)
+
+    def append(self, bars: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, int]:
+        """
+        Appends new daily bars to the CSVs and, if compiled, the store.
+
+        Bars on or before a ticker's last stored day are ignored, so ingesting
+        the same file twice is harmless. Nothing is rebuilt: each ticker's CSV
+        gets the new rows appended and its store delta file is rewritten.
+
+        Args:
+            bars: A dict mapping tickers to columnar bars, as read_csv_arrays
+                returns them
+
+        Returns:
+            A dict mapping each ticker to the number of bars appended.
+        """
+        self._ensure_loaded()
+        appended = {}
+        changed = {}
+
+        for ticker, rows in bars.items():
+            order = np.argsort(rows["day"], kind="stable")
+            rows = {name: np.asarray(values)[order] for name, values in rows.items()}
+            _, unique = np.unique(rows["day"], return_index=True)
+            rows = {name: values[unique] for name, values in rows.items()}
+
+            if self.has(ticker):
+                days = self.arrays(ticker)["day"]
+                if len(days):
+                    keep = rows["day"] > days[-1]
+                    rows = {name: values[keep] for name, values in rows.items()}
+            if len(rows["day"]) == 0:
+                appended[ticker] = 0
+                continue
+
+            append_csv(self.csv_path(ticker), rows)
+            if self.loaded:
+                self._write_delta(ticker, rows)
+            appended[ticker] = len(rows["day"])
+            changed[ticker] = (rows["day"], rows["close"])
+
+        if changed:
+            self.manifest.update(changed)
+        if self.loaded:
+            self._apply(self._read_deltas())
+        else:
+            self._ingested += sum(appended.values())
+            self._apply(changed)
+        return appended
+
+    def _write_delta(self, ticker: str, rows: Dict[str, np.ndarray]):
+        path = self.delta_path(ticker)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            with np.load(path) as delta:
+                rows = {
+                    name: np.concatenate([delta[name], rows[name]]) for name in delta.files
+                }
+
+        rows["day"] = rows["day"].astype(np.int32)
+        for field in FIELDS:
+            rows[field] = rows[field].astype(np.float64)
+        with open(f"{path}.tmp", "wb") as f:
+            np.savez(f, **rows)
+        os.replace(f"{path}.tmp", path)
+
+    @property
+    def tickers(self) -> List[str]:
+        """
+        Returns: The sorted list of tickers with price data.
+        """
+        self._ensure_loaded()
+        if self.loaded:
+            return sorted(set(self._tickers) | set(self._merged))
+        if self.dataset is not None:
+            return self.dataset.tickers
+        return sorted(
+            name[: -len(".csv")]
+            for name in os.listdir(self.data_dir)
+            if name.endswith(".csv")
+        )
+
+    def has(self, ticker: str) -> bool:
+        """
+        Args:
+            ticker: The stock ticker
+
+        Returns: True if there is price data for the ticker.
+        """
+        self._ensure_loaded()
+        if self.loaded:
+            return ticker in self._index or ticker in self._merged
+        if self.dataset is not None:
+            return self.dataset.has(ticker)
+        return os.path.exists(self.csv_path(ticker))
+
+    def matrix(self) -> PriceMatrix:
+        """
+        Returns the universe aligned on the master trading calendar.
+
+        The matrix is shared by every caller until the store is reloaded. With
+        a compiled store it is mapped from the segment of the current version
+        if another process already published one, and otherwise built and
+        published for them.
+
+        Returns:
+            The PriceMatrix of every ticker's closes.
+        """
+        self._ensure_loaded()
+        with self._matrix_lock:
+            if self._matrix is None:
+                directory = self._segment_dir()
+                if directory is not None:
+                    self._matrix = shared.attach(directory, self.version)
+            if self._matrix is None:
+                self._matrix = self._share(PriceMatrix.build(self))
+            return self._matrix
+
+    def arrays(self, ticker: str) -> Dict[str, np.ndarray]:
+        """
+        Returns the full history of a ticker as columnar arrays.
+
+        With a compiled store these are read-only views into the memory map,
+        or decoded once into the LRU cache from a compact store; otherwise the
+        ticker's CSV is parsed once and kept in the LRU cache.
+
+        Args:
+            ticker: The stock ticker
+
+        Returns:
+            A dict with a sorted 'day' array and one array per OHLCV field.
+
+        Raises:
+            ValueError: If there is no price data for the ticker.
+        """
+        self._ensure_loaded()
+        if self.loaded:
+            merged = self._merged.get(ticker)
+            if merged is not None:
+                return merged
+            if ticker not in self._index:
+                raise ValueError(f"No price data for ticker {ticker}")
+            return self._base_arrays(ticker)
+
+        if self.dataset is not None:
+            if not self.dataset.has(ticker):
+                raise ValueError(f"No price data for ticker {ticker}")
+            return self.cache.get(
+                ticker,
+                self.dataset.ticker_path(ticker),
+                lambda _: self.dataset.read(ticker),
+            )
+
+        path = self.csv_path(ticker)
+        if not os.path.exists(path):
+            raise ValueError(f"No price data for ticker {ticker}")
+        return self.cache.get(ticker, path, read_csv_arrays)
+
+    def range_arrays(self, ticker: str, start=None, end=None) -> Dict[str, np.ndarray]:
+        """
+        Returns at least the days and closes of a ticker between two dates.
+
+        Without a compiled store, and unless the ticker is already cached, only
+        the rows of the requested range are read from the Parquet dataset or
+        the CSV. The result may then hold just the 'day' and 'close' arrays of
+        that range.
+
+        Args:
+            ticker: The stock ticker
+            start: The first date needed, unbounded if None
+            end: The last date needed, unbounded if None
+
+        Returns:
+            A dict with a sorted 'day' array and at least a 'close' array.
+
+        Raises:
+            ValueError: If there is no price data for the ticker.
+        """
+        self._ensure_loaded()
+        if self.loaded or (start is None and end is None):
+            return self.arrays(ticker)
+
+        if self.dataset is not None:
+            if not self.dataset.has(ticker):
+                raise ValueError(f"No price data for ticker {ticker}")
+            cached = self.cache.peek(ticker, self.dataset.ticker_path(ticker))
+            if cached is not None:
+                return cached
+            return self.dataset.read(ticker, start, end, ("close",))
+
+        path = self.csv_path(ticker)
+        if not os.path.exists(path):
+            raise ValueError(f"No price data for ticker {ticker}")
+        cached = self.cache.peek(ticker, path)
+        if cached is not None:
+            return cached
+        return self.partial.read(path, self.index_path(ticker), start, end)
+
+    def bounds(self, days: np.ndarray, start=None, end=None) -> Tuple[int, int]:
+        """
+        Finds the slice of a sorted day array within [start, end].
+
+        Args:
+            days: A sorted array of day numbers
+            start: The first date to include, unbounded if None
+            end: The last date to include, unbounded if None
+
+        Returns:
+            A (lo, hi) tuple to slice the ticker's arrays with.
+        """
+        lo = 0 if start is None else int(np.searchsorted(days, to_day(start), "left"))
+        hi = (
+            len(days)
+            if end is None
+            else int(np.searchsorted(days, to_day(end), "right"))
+        )
+        return lo, max(lo, hi)
+
+    def close(self, ticker: str, date) -> float | None:
+        """
+        Looks up the closing price of a ticker on a single day.
+
+        Args:
+            ticker: The stock ticker
+            date: The trading day
+
+        Returns:
+            The closing price, or None if the market was closed for the ticker.
+        """
+        price = self.closes([ticker], [date])[0, 0]
+        return None if np.isnan(price) else float(price)
+
+    def frame(
+        self, ticker: str, start=None, end=None, fields: Sequence[str] = ("close",)
+    ) -> pd.DataFrame:
+        """
+        Returns a ticker's prices between two dates as a DataFrame.
+
+        Args:
+            ticker: The stock ticker
+            start: The first date to include, unbounded if None
+            end: The last date to include, unbounded if None
+            fields: The OHLCV fields to include
+
+        Returns:
+            A DataFrame with a datetime 'Date' column and one capitalized
+            column per field, e.g. 'Close'.
+        """
+        if set(fields) <= {"close"}:
+            arrays = self.range_arrays(ticker, start, end)
+        else:
+            arrays = self.arrays(ticker)
+        lo, hi = self.bounds(arrays["day"], start, end)
+        data = {"Date": from_days(arrays["day"][lo:hi])}
+        for field in fields:
+            data[field.capitalize()] = arrays[field][lo:hi]
+        return pd.DataFrame(data)
+
+    def closes(
+        self, tickers: Sequence[str], dates, missing: str = "nan", field: str = "close"
+    ) -> np.ndarray:
+        """
+        Looks up the prices of many tickers on many days in one call.
+
+        Each ticker's sorted day array is binary searched for every requested
+        day at once, instead of scanning the history per (ticker, day).
+
+        Args:
+            tickers: The stock tickers, one per output column
+            dates: The days to look up, one per output row, in any order
+            missing: What to return for a day the ticker did not trade:
+                'nan', the 'previous' close or the 'next' close. Days with no
+                previous (or next) close in the ticker's history are NaN.
+            field: The OHLCV field to look up
+
+        Returns:
+            A float64 array of shape (len(dates), len(tickers)).
+
+        Raises:
+            ValueError: If a ticker is unknown or missing is not supported.
+        """
+        if missing not in MISSING:
+            raise ValueError(f"Unsupported missing-day mode {missing}")
+
+        days = to_days(dates)
+        out = np.full((len(days), len(tickers)), np.nan)
+
+        # Days are only ever matched exactly in 'nan' mode, so the CSV fallback
+        # can restrict itself to the requested range
+        exact = missing == "nan" and field == "close" and len(days) > 0
+        first = int(days.min()) if exact else None
+        last = int(days.max()) if exact else None
+
+        for j, ticker in enumerate(tickers):
+            arrays = self.range_arrays(ticker, first, last)
+            idx, valid = _positions(arrays["day"], days, missing)
+            out[valid, j] = arrays[field][idx[valid]]
+
+        return out
+
+    def growth(self, ticker: str, start, end, missing: str = "previous") -> float:
+        """
+        Returns the growth factor close(end) / close(start) of a ticker.
+
+        Args:
+            ticker: The stock ticker
+            start: The day to grow from
+            end: The day to grow to
+            missing: How to resolve non-trading days, as in closes()
+
+        Returns:
+            The growth factor, or NaN if either day has no close.
+        """
+        return float(self.growth_many([ticker], [start], [end], missing)[0])
+
+    def growth_many(
+        self, tickers: Sequence[str], starts, ends, missing: str = "previous"
+    ) -> np.ndarray:
+        """
+        Returns the growth factors of many (ticker, start, end) queries.
+
+        Each factor is the exponential of a difference of the ticker's
+        cumulative log returns, so no price history is rescanned.
+
+        Args:
+            tickers: The stock ticker of each query
+            starts: The day each query grows from
+            ends: The day each query grows to
+            missing: How to resolve non-trading days, as in closes()
+
+        Returns:
+            A float64 array with one growth factor (or NaN) per query.
+
+        Raises:
+            ValueError: If a ticker is unknown or missing is not supported.
+        """
+        if missing not in MISSING:
+            raise ValueError(f"Unsupported missing-day mode {missing}")
+
+        starts, ends = to_days(starts), to_days(ends)
+        out = np.full(len(starts), np.nan)
+
+        # The queries of each ticker, grouped by hashing rather than comparing
+        # every query with every ticker
+        codes, names = pd.factorize(np.asarray(tickers, dtype=object))
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+
+        for k, ticker in enumerate(names):
+            queries = order[bounds[k] : bounds[k + 1]]
+            arrays = self.arrays(str(ticker))
+            ia, valid_a = _positions(arrays["day"], starts[queries], missing)
+            ib, valid_b = _positions(arrays["day"], ends[queries], missing)
+            valid = valid_a & valid_b
+            cumlog = arrays["cumlog"]
+            out[queries[valid]] = np.exp(cumlog[ib[valid]] - cumlog[ia[valid]])
+
+        return out
+
+
+def _positions(days: np.ndarray, query: np.ndarray, missing: str):
+    # Resolves query days to positions in a ticker's sorted day array
+    if len(days) == 0:
+        return np.zeros(len(query), dtype=np.intp), np.zeros(len(query), dtype=bool)
+
+    if missing == "next":
+        idx = np.searchsorted(days, query, "left")
+        valid = idx < len(days)
+    else:
+        idx = np.searchsorted(days, query, "right") - 1
+        valid = idx >= 0
+        if missing == "nan":
+            valid &= days[np.maximum(idx, 0)] == query
+    return np.minimum(np.maximum(idx, 0), len(days) - 1), valid
@@ -0,0 +1,56 @@
+import sys
+
+import numpy as np
+from rich import print
+
+from prices import FIELDS, Prices
+from prices.compact import describe
+from prices.store import read_csv_arrays
+
+
+def verify(store) -> list:
+    """
+    Checks that every ticker of a compiled store round-trips its CSV exactly.
+
+    Args:
+        store: The PriceStore to check, with its store loaded
+
+    Returns:
+        The tickers whose stored history differs from their CSV.
+    """
+    mismatched = []
+    for ticker in store.tickers:
+        expected = read_csv_arrays(store.csv_path(ticker))
+        actual = store.arrays(ticker)
+        if not all(
+            np.array_equal(actual[name], expected[name])
+            for name in ("day", *FIELDS)
+        ):
+            mismatched.append(ticker)
+    return mismatched
+
+
+def main():
+    if len(sys.argv) > 1:
+        Prices.set_paths(*sys.argv[1:3])
+
+    if not Prices.load():
+        print(f"[red][!] No compiled store in '{Prices.store_dir}'")
+        sys.exit(1)
+
+    if Prices.meta.get("format") == "compact":
+        sizes = describe(Prices.store_dir)
+        print(
+            f"[green][+] Compact store of {Prices.meta['rows']} rows takes "
+            f"{sum(sizes.values()) / 1024 / 1024:.1f} MB"
+        )
+
+    mismatched = verify(Prices)
+    if mismatched:
+        print(f"[red][!] {len(mismatched)} tickers differ from their CSV: {mismatched}")
+        sys.exit(1)
+    print(f"[green][+] All {len(Prices.tickers)} tickers match their CSV exactly")
+
+
+if __name__ == "__main__":
+    main()
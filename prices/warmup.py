@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PriceWarmup:
+    """
+    Loads (compiling if needed) and pages in price data on a background thread.
+
+    The server keeps accepting traffic while the warmup runs; its progress is
+    reported through status() so a health check can hold traffic until ready.
+    """
+
+    state = "disabled"
+    total = 0
+    done = 0
+    error: str | None = None
+    started: float | None = None
+    finished: float | None = None
+
+    def __init__(self, store):
+        self.store = store
+        self._thread: threading.Thread | None = None
+
+    def start(self, tickers: List[str] | None = None) -> threading.Thread:
+        """
+        Starts warming up price data in the background.
+
+        Args:
+            tickers: The hot set of tickers to warm up, or None for the whole
+                universe including the aligned price matrix.
+
+        Returns:
+            The warmup thread.
+        """
+        self.state = "starting"
+        self.total = 0
+        self.done = 0
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+
+        self._thread = threading.Thread(
+            target=self._run, args=(tickers,), name="price-warmup", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def _run(self, tickers: List[str] | None):
+        try:
+            if not self.store.load():
+                self.state = "compiling"
+                self.store.build()
+                self.store.load()
+
+            self.state = "loading"
+            if tickers is None:
+                targets = self.store.tickers
+            else:
+                targets = [ticker for ticker in tickers if self.store.has(ticker)]
+            self.total = len(targets)
+
+            for ticker in targets:
+                # Touch every column so memory-mapped pages are resident
+                for values in self.store.arrays(ticker).values():
+                    np.add.reduce(values, dtype=np.float64)
+                self.done += 1
+
+            if tickers is None:
+                self.state = "aligning"
+                self.store.matrix()
+
+            self.state = "ready"
+        except Exception as e:
+            # The health check reports only the exception class, the log has the rest
+            logger.exception("Price warmup failed")
+            self.error = type(e).__name__
+            self.state = "failed"
+        finally:
+            self.finished = time.time()
+
+    @property
+    def ready(self) -> bool:
+        """
+        Returns: True once the warmup finished, or if it was never started.
+        """
+        return self.state in ("ready", "disabled")
+
+    def status(self) -> dict:
+        """
+        Returns: The warmup state, progress and timings.
+        """
+        elapsed = None
+        if self.started is not None:
+            elapsed = (self.finished or time.time()) - self.started
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "done": self.done,
+            "total": self.total,
+            "elapsed": elapsed,
+            "error": self.error,
+        }
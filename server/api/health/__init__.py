@@ -0,0 +1,33 @@
+from flask import jsonify
+
+from database import DB
+from prices import Prices, Warmup
+from server.app import api_router as app
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    """
+    Reports whether this worker is ready to serve traffic.
+
+    Returns 503 while the price data warmup is still running, so a load
+    balancer can hold traffic until the warmup finishes.
+
+    Returns:
+        A JSON response with the database and price data status.
+    """
+    prices = Warmup.status()
+    prices["store_loaded"] = Prices.loaded
+    prices["cache"] = Prices.cache.stats()
+
+    ready = DB.connected and Warmup.ready
+    return (
+        jsonify(
+            {
+                "status": 1 if ready else 0,
+                "error": 0,
+                "data": {"database": DB.connected, "prices": prices},
+            }
+        ),
+        200 if ready else 503,
+    )
@@ -1,163 +1,211 @@
 import base64
-import json
 import os
-from datetime import datetime, time
+from datetime import datetime
 from typing import Dict
 
 import pandas as pd
 from dateutil.parser import parse
-from dateutil.relativedelta import relativedelta
 from flask import jsonify, request
 from google import genai
 from google.genai import types
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 
 from database import DB
-from models import Account, Order, OrderType, Portfolio, Transaction, User
+from engine import (Backtests, Benchmarks, Checkpoints, Compute, ComputeBusy,
+                    Replay, downsample_frame, downsample_series, parse_orders,
+                    parse_resolution, series_json, summary_statistics, tasks)
+from models import (Account, Order, OrderType, Portfolio, PortfolioSeries,
+                    PositionCheckpoint, Transaction, User)
 from nessie import Account as NessieAccount
 from nessie import AccountType, Customer, NessieClient
 from server.app import api_router as app
+from server.app import json_response
 
 
-def insert_buy_order(
-    portfolio, date, ticker, shares, price_Per_Share, start_date, end_date
-):
-    data_route = f"stockdata/{ticker}.csv"
-    df = pd.read_csv(data_route)
-    df["Date"] = pd.to_datetime(df["Date"])
+@app.route("/user/<oauth_sub>/portfolio", methods=["GET"])
+def get_portfolio(oauth_sub):
+    if not DB.connected:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Database not connected"}),
+            500,
+        )
 
-    # Convert order date to datetime and use it as the start for this ticker's data
-    order_date = pd.to_datetime(date)
+    session = DB.create_session()
 
-    # Filter the ticker's data starting at the order date (not the overall start_date)
-    mask = (df["Date"] >= order_date) & (df["Date"] <= end_date)
-    temp_df = df.loc[mask, ["Date", "Close"]]
+    located_user = session.query(User).filter(User.oauth_sub == oauth_sub).first()
 
-    # Compute daily return relative to the close price on the order date
-    base_close = temp_df["Close"].iloc[0]
-    temp_df["Daily Return"] = temp_df["Close"] / base_close
-    temp_df.set_index("Date", inplace=True)
+    if not located_user:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "User not found"}),
+            404,
+        )
 
-    # Calculate the order’s initial value
-    start_val = shares * price_Per_Share
+    #       {
+    #     "Date": "2025-03-13",
+    #     "Order_Type": "Buy",
+    #     "Ticker": "AAPL",
+    #     "Shares": 10,
+    #     "Price_Per_Share": 250.0
+    #   }
 
-    # Create a new series for the new order, initializing with zeros across the portfolio's index
-    new_order_series = pd.Series(0, index=portfolio.index)
-    new_order_series.loc[temp_df.index] = start_val * temp_df["Daily Return"]
+    if not located_user.portfolio:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Portfolio not found"}),
+            404,
+        )
 
-    # If the ticker already exists, add the new order's series to the existing values;
-    # otherwise, simply assign the new series to that ticker.
-    if ticker in portfolio.columns:
-        portfolio[ticker] = portfolio[ticker].fillna(0) + new_order_series
-    else:
-        portfolio[ticker] = new_order_series
+    if len(located_user.portfolio.orders) == 0:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "No orders found"}),
+            404,
+        )
+
+    user_orders_json = portfolio_orders_json(located_user.portfolio)
+
+    try:
+        as_of = request.args.get("as_of")
+        if as_of is not None:
+            as_of = parse(as_of)
+        resolution = parse_resolution(request.args.get("resolution"))
+        if Replay.enabled:
+            # The materialized series comes from its JSONB column as a dict
+            record = materialize_series(
+                session, located_user.portfolio, user_orders_json, as_of
+            )
+            series = downsample_series(record["series"], resolution)
+            allocations = record["allocations"]
+        else:
+            series, allocations = Compute.run(tasks.portfolio, user_orders_json)
+            series = series_json(downsample_series(series, resolution))
+    except (ValueError, OverflowError) as e:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": str(e)}),
+            400,
+        )
+    except ComputeBusy:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Server busy, try again shortly"}),
+            503,
+        )
+    except TimeoutError:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Computation timed out"}),
+            504,
+        )
 
-    return portfolio
+    session.close()
 
+    return json_response(
+        {
+            "status": 1,
+            "error": 0,
+            "data": {"series": series, "allocations": allocations},
+        }
+    )
 
-def insert_sell_order(
-    portfolio, date, ticker, shares, price_Per_Share, start_date, end_date
-):
-    order_date = pd.to_datetime(date)
-    sell_amount = shares * price_Per_Share
 
-    # Make sure the ticker exists
-    if ticker not in portfolio.columns:
-        raise ValueError(
-            f"Ticker {ticker} not found in portfolio. Cannot process sell order."
-        )
+def portfolio_orders_json(portfolio) -> list:
+    """
+    Args:
+        portfolio: The Portfolio
 
-    # Subtract the sell amount for every trading day on and after the sell date
-    portfolio.loc[portfolio.index >= order_date, ticker] -= sell_amount
+    Returns: The portfolio's orders from earliest to latest, as
+        tasks.portfolio takes them.
+    """
+    return orders_json(portfolio.orders)
 
-    return portfolio
 
+def orders_json(orders) -> list:
+    """
+    Args:
+        orders: Order rows
 
-def process_orders_from_json(orders_json):
-    # Since orders are always provided as JSON, parse them if necessary.
-    if isinstance(orders_json, str):
-        orders_list = json.loads(orders_json)
-    else:
-        orders_list = orders_json
-    orders = pd.DataFrame(orders_list)
-
-    # Basic error checking: ensure orders DataFrame is not empty and required columns exist
-    if orders.empty:
-        raise ValueError("Orders JSON is empty. Please provide valid order data.")
-    required_columns = ["Date", "Order_Type", "Ticker", "Shares", "Price_Per_Share"]
-    missing_cols = [col for col in required_columns if col not in orders.columns]
-    if missing_cols:
-        raise ValueError(f"Missing required fields in orders JSON: {missing_cols}")
-
-    # Clean and prepare orders DataFrame
-    orders["Date"] = pd.to_datetime(orders["Date"])
-    orders["Order_Type"] = orders["Order_Type"].str.strip().str.lower()
-    orders["Ticker"] = orders["Ticker"].str.strip()
-    orders.sort_values("Date", inplace=True)
-
-    # Overall start and end dates
-    start_date = orders["Date"].min()
-    end_date = "2025-03-29"
-
-    # Use the first order's ticker (assumed to be a buy) to build the portfolio index.
-    first_order = orders.iloc[0]
-    first_ticker = first_order["Ticker"]
-    try:
-        df_first = pd.read_csv(f"stockdata/{first_ticker}.csv")
-    except Exception as e:
-        raise ValueError(f"Error reading stock data for ticker {first_ticker}: {e}")
-
-    df_first["Date"] = pd.to_datetime(df_first["Date"])
-    mask = (df_first["Date"] >= start_date) & (df_first["Date"] <= end_date)
-    filtered_close = df_first.loc[mask, ["Date", "Close"]]
-    filtered_close["Daily Return"] = (
-        filtered_close["Close"] / filtered_close["Close"].iloc[0]
-    )
+    Returns: The orders from earliest to latest, as tasks.portfolio takes
+        them.
+    """
+    # Sort user orders from earliest to latest
+    user_orders = sorted(orders, key=lambda order: order.date)
 
-    # Create portfolio using only the dates when the market was open (from the first ticker's CSV)
-    portfolio = pd.DataFrame(
+    return [
         {
-            "Date": filtered_close["Date"],
-            first_ticker: first_order["Shares"]
-            * first_order["Price_Per_Share"]
-            * filtered_close["Daily Return"],
+            "Date": order.date.strftime("%Y-%m-%d"),
+            "Order_Type": str(order.type.value),
+            "Shares": order.shares,
+            "Price_Per_Share": order.price_per_share,
+            "Ticker": order.ticker,
         }
-    )
-    portfolio.set_index("Date", inplace=True)
-
-    # Process subsequent orders (starting from index 1)
-    for idx, order in orders.iloc[1:].iterrows():
-        order_date = order["Date"]
-        order_type = order["Order_Type"]
-        ticker = order["Ticker"]
-        shares = order["Shares"]
-        price = order["Price_Per_Share"]
-
-        if order_type == "buy":
-            portfolio = insert_buy_order(
-                portfolio, order_date, ticker, shares, price, start_date, end_date
-            )
-        elif order_type == "sell":
-            portfolio = insert_sell_order(
-                portfolio, order_date, ticker, shares, price, start_date, end_date
-            )
-        else:
-            print(f"Unrecognized order type: {order_type}")
+        for order in user_orders
+    ]
 
-    allocations = {}
-    for column in portfolio.columns:
-        allocations[column] = portfolio[column].iloc[-1]
-    # Add the "total" column by summing across all ticker columns for each day
-    portfolio["Value"] = portfolio.sum(axis=1)
-    final_series = portfolio[["Value"]]
-    for item, val in allocations.items():
-        allocations[item] = val / final_series["Value"].iloc[-1] * 100
-    final_series.index = final_series.index.strftime("%Y-%m-%d")
-    port_val = json.loads(final_series.to_json())["Value"]
-    return port_val, allocations
 
+def materialize_series(session, portfolio, orders_json, as_of=None) -> dict:
+    """
+    Returns a portfolio's stored daily value series, recomputing only stale days.
 
-@app.route("/user/<oauth_sub>/portfolio", methods=["GET"])
-def get_portfolio(oauth_sub):
+    Args:
+        session: The database session the portfolio was loaded with
+        portfolio: The Portfolio
+        orders_json: The portfolio's orders, as tasks.portfolio takes them
+        as_of: The last day of the series, defaults to the latest price
+
+    Returns:
+        The materialized record, with the 'series' and 'allocations'.
+    """
+    stored = portfolio.series
+    record = None
+    if stored is not None:
+        record = {
+            "orders_digest": stored.orders_digest,
+            "price_version": stored.price_version,
+            "as_of": stored.as_of.strftime("%Y-%m-%d"),
+            "series": stored.series,
+            "allocations": stored.allocations,
+            "state": stored.state,
+        }
+
+    record = Compute.run(tasks.refresh, record, orders_json, as_of)
+    if record["replayed"] == 0:
+        return record
+
+    if stored is None:
+        stored = PortfolioSeries(portfolio=portfolio)
+        session.add(stored)
+    stored.orders_digest = record["orders_digest"]
+    stored.price_version = record["price_version"]
+    stored.as_of = parse(record["as_of"]).date()
+    stored.series = record["series"]
+    stored.allocations = record["allocations"]
+    stored.state = record["state"]
+    stored.analytics = None
+    try:
+        session.commit()
+    except IntegrityError:
+        # Another request stored the same portfolio first
+        session.rollback()
+    return record
+
+
+# The rolling windows in trading days /portfolio/analytics computes, and how
+# many parameter sets it stores per series before starting over
+ROLLING_WINDOWS = (5, 10, 21, 42, 63, 126, 252, 504, 756, 1260)
+MAX_STORED_ANALYTICS = 16
+
+
+@app.route("/user/<oauth_sub>/portfolio/analytics", methods=["GET"])
+def get_portfolio_analytics(oauth_sub):
+    """
+    Returns the risk and performance statistics of the user's portfolio.
+
+    Takes the same 'as_of' query parameter as /portfolio, plus the annual
+    'risk_free' rate (default 0, rounded to a basis point) and comma
+    separated rolling 'windows' in trading days out of ROLLING_WINDOWS
+    (default 21,63,252). The summary statistics are stored with the
+    materialized series and only recomputed when it changes.
+    """
     if not DB.connected:
         return (
             jsonify({"status": 0, "error": 1, "message": "Database not connected"}),
@@ -174,14 +222,6 @@ def get_portfolio(oauth_sub):
             404,
         )
 
-    #       {
-    #     "Date": "2025-03-13",
-    #     "Order_Type": "Buy",
-    #     "Ticker": "AAPL",
-    #     "Shares": 10,
-    #     "Price_Per_Share": 250.0
-    #   }
-
     if not located_user.portfolio:
         return (
             jsonify({"status": 0, "error": 1, "message": "Portfolio not found"}),
@@ -194,23 +234,170 @@ def get_portfolio(oauth_sub):
             404,
         )
 
-    user_orders = located_user.portfolio.orders
+    user_orders_json = portfolio_orders_json(located_user.portfolio)
 
-    # Sort user orders from earliest to latest
-    user_orders = sorted(user_orders, key=lambda order: order.date)
+    try:
+        as_of = request.args.get("as_of")
+        if as_of is not None:
+            as_of = parse(as_of)
+        risk_free_rate = round(float(request.args.get("risk_free", 0.0)), 4)
+        windows = sorted(
+            {
+                int(window)
+                for window in request.args.get("windows", "21,63,252").split(",")
+                if window.strip()
+            }
+        )
+        unsupported = [window for window in windows if window not in ROLLING_WINDOWS]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported windows {unsupported}, expected some of "
+                f"{', '.join(str(window) for window in ROLLING_WINDOWS)}"
+            )
+        analytics = materialize_analytics(
+            session,
+            located_user.portfolio,
+            user_orders_json,
+            as_of,
+            risk_free_rate,
+            windows,
+        )
+    except (ValueError, OverflowError) as e:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": str(e)}),
+            400,
+        )
+    except ComputeBusy:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Server busy, try again shortly"}),
+            503,
+        )
+    except TimeoutError:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Computation timed out"}),
+            504,
+        )
 
-    user_orders_json = [
-        {
-            "Date": order.date.strftime("%Y-%m-%d"),
-            "Order_Type": str(order.type.value),
-            "Shares": order.shares,
-            "Price_Per_Share": order.price_per_share,
-            "Ticker": order.ticker,
+    session.close()
+
+    return jsonify({"status": 1, "error": 0, "data": analytics})
+
+
+def materialize_analytics(
+    session, portfolio, orders_json, as_of, risk_free_rate: float, windows: list
+) -> dict:
+    """
+    Returns a portfolio's analytics, computed once per materialized series.
+
+    Args:
+        session: The database session the portfolio was loaded with
+        portfolio: The Portfolio
+        orders_json: The portfolio's orders, as tasks.portfolio takes them
+        as_of: The last day of the series, defaults to the latest price
+        risk_free_rate: The annual risk-free rate
+        windows: The lengths in trading days of the rolling statistics
+
+    Returns:
+        The statistics analyze returns. Only the summary statistics are
+        stored; the per-day 'returns' and 'rolling' are recomputed from the
+        series on every request, so the stored row does not grow with it.
+    """
+    key = f"{risk_free_rate!r}|{','.join(str(window) for window in windows)}"
+
+    stored = None
+    if Replay.enabled:
+        record = materialize_series(session, portfolio, orders_json, as_of)
+        series = record["series"]
+        # The stored row may be another request's if it won the insert
+        stored = portfolio.series
+        if stored is not None and (
+            stored.orders_digest != record["orders_digest"]
+            or stored.price_version != record["price_version"]
+            or stored.as_of.strftime("%Y-%m-%d") != record["as_of"]
+        ):
+            stored = None
+        if stored is not None and key in (stored.analytics or {}):
+            summary = summary_statistics(stored.analytics[key])
+            return dict(
+                summary,
+                **Compute.run(tasks.analytics_series, series, orders_json, windows),
+            )
+    else:
+        series, _ = Compute.run(tasks.portfolio, orders_json)
+        series = series.to_dict()
+
+    analytics = Compute.run(tasks.analytics, series, orders_json, risk_free_rate, windows)
+
+    if stored is not None:
+        cached = {
+            cached_key: summary_statistics(value)
+            for cached_key, value in (stored.analytics or {}).items()
         }
-        for order in user_orders
-    ]
+        if len(cached) >= MAX_STORED_ANALYTICS:
+            cached = {}
+        stored.analytics = dict(cached, **{key: summary_statistics(analytics)})
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+    return analytics
+
+
+@app.route("/user/<oauth_sub>/portfolio/holdings", methods=["GET"])
+def get_portfolio_holdings(oauth_sub):
+    """
+    Returns the shares held and net amount invested on the 'date' query
+    parameter, today by default.
+    """
+    return point_in_time(oauth_sub, value=False)
+
+
+@app.route("/user/<oauth_sub>/portfolio/value", methods=["GET"])
+def get_portfolio_value(oauth_sub):
+    """
+    Returns the value of the portfolio, and of each position, at the close of
+    the 'date' query parameter, today by default.
+    """
+    return point_in_time(oauth_sub, value=True)
+
+
+def point_in_time(oauth_sub, value: bool):
+    if not DB.connected:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Database not connected"}),
+            500,
+        )
+
+    session = DB.create_session()
+
+    located_user = session.query(User).filter(User.oauth_sub == oauth_sub).first()
+
+    if not located_user:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "User not found"}),
+            404,
+        )
 
-    series, allocations = process_orders_from_json(user_orders_json)
+    if not located_user.portfolio:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Portfolio not found"}),
+            404,
+        )
+
+    try:
+        date = parse(request.args.get("date", datetime.now().strftime("%Y-%m-%d"))).date()
+        position = position_at(session, located_user.portfolio, date)
+        if value:
+            position.update(Checkpoints.value(position.pop("holdings"), date))
+    except (ValueError, OverflowError) as e:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": str(e)}),
+            400,
+        )
 
     session.close()
 
@@ -218,79 +405,102 @@ def get_portfolio(oauth_sub):
         {
             "status": 1,
             "error": 0,
-            "data": {"series": series, "allocations": allocations},
+            "data": dict(position, date=date.strftime("%Y-%m-%d")),
         }
     )
 
 
+def position_at(session, portfolio, date) -> dict:
+    """
+    Returns a portfolio's holdings after every order up to a date.
+
+    Starts from the nearest stored checkpoint on or before the date and
+    replays the orders after it. The checkpoints are rebuilt from the whole
+    history when there are none, when orders were added after the last one,
+    or when the order count up to the nearest one no longer matches.
+
+    Args:
+        session: The database session the portfolio was loaded with
+        portfolio: The Portfolio
+        date: The date
+
+    Returns:
+        The 'holdings' as a dict of ticker to shares, and the net amount
+        'invested'.
+    """
+    checkpoints = session.query(PositionCheckpoint).filter(
+        PositionCheckpoint.portfolio_id == portfolio.id
+    )
+    orders = session.query(Order).filter(Order.portfolio_id == portfolio.id)
+
+    def nearest():
+        return (
+            checkpoints.filter(PositionCheckpoint.date <= date)
+            .order_by(PositionCheckpoint.date.desc())
+            .first()
+        )
+
+    last = checkpoints.order_by(PositionCheckpoint.date.desc()).first()
+    checkpoint = nearest()
+    stale = last is None or orders.filter(Order.date > last.date).count() > 0
+    if not stale and checkpoint is not None:
+        covered = orders.filter(Order.date <= checkpoint.date)
+        stale = covered.with_entities(func.count(Order.id)).scalar() != checkpoint.orders
+
+    if stale and portfolio.orders:
+        checkpoints.delete(synchronize_session=False)
+        for built in Checkpoints.build(parse_orders(orders_json(portfolio.orders))):
+            session.add(
+                PositionCheckpoint(
+                    portfolio_id=portfolio.id,
+                    date=parse(built["date"]).date(),
+                    orders=built["orders"],
+                    holdings=built["holdings"],
+                    invested=built["invested"],
+                )
+            )
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another request rebuilt them first
+            session.rollback()
+        checkpoint = nearest()
+
+    remaining = orders.filter(Order.date <= date)
+    if checkpoint is not None:
+        remaining = remaining.filter(Order.date > checkpoint.date)
+    remaining = remaining.all()
+
+    return Checkpoints.advance(
+        (
+            {"holdings": checkpoint.holdings, "invested": checkpoint.invested}
+            if checkpoint is not None
+            else None
+        ),
+        parse_orders(orders_json(remaining)) if remaining else None,
+    )
+
+
 def gen_timeseries_portfolio(
     start_date: datetime, end_date: datetime, monthly_savings: float, allocations: Dict
 ) -> pd.DataFrame:
     """
     Generates a time series of daily portfolio value based on monthly investments and allocations.
 
+    Each ticker is bought on its first trading day on or after the start date
+    and on or after the first of every following month.
+
     Args:
         start_date (datetime): The starting date of the investment period.
         end_date (datetime): The ending date of the investment period.
         monthly_savings (float): The amount to invest each month.
-        allocations (Dict): A dictionary mapping stock tickers to their allocation percentages (e.g., {"AAPL": 0.5, "MSFT": 0.5}).
+        allocations (Dict): A dictionary mapping stock tickers to their allocation percentages (e.g., {"AAPL": 50, "MSFT": 50}).
 
     Returns:
-        pd.DataFrame: A DataFrame with a 'date' column and a 'portfolio_value' column.  The 'portfolio_value'
+        pd.DataFrame: A DataFrame indexed by 'date' with a 'portfolio_value' column.  The 'portfolio_value'
                        column contains the total value of the portfolio for each day in the specified period.
     """
-
-    # Initialize data structures
-    portfolio = {
-        ticker: 0.0 for ticker in allocations
-    }  # Number of shares of each stock
-    portfolio_values = []
-    dates = []
-
-    stock_dfs = {}
-
-    # Fetch stock data
-    for ticker in allocations:
-        stock_df = pd.read_csv(os.path.join(os.getcwd(), "stockdata", f"{ticker}.csv"))
-        stock_dfs[ticker] = stock_df
-
-    def get_price(ticker, date):
-        if date not in stock_dfs[ticker]["Date"].values:
-            return None
-        return stock_dfs[ticker][stock_dfs[ticker]["Date"] == date]["Close"].values[0]
-
-    start = False
-    current_date = start_date
-    while datetime.combine(current_date, time.min) <= end_date:
-        date_str = current_date.strftime("%Y-%m-%d")
-
-        # Monthly investment
-        if current_date.day == 1 or start is False:
-            for ticker, allocation in allocations.items():
-                allocation /= 100
-                stock_price = get_price(ticker, date_str)
-                if stock_price is not None:  # Ensure it's a trading day
-                    shares_to_buy = (monthly_savings * allocation) / stock_price
-                    portfolio[ticker] += shares_to_buy
-                    start = True
-
-        # Calculate daily portfolio value
-        total_portfolio_value = 0.0
-        for ticker, num_shares in portfolio.items():
-            stock_price = get_price(ticker, date_str)
-            if stock_price is not None:  # Handle no trading day.
-                total_portfolio_value += num_shares * stock_price
-
-        portfolio_values.append(total_portfolio_value)
-        dates.append(current_date)
-        current_date += relativedelta(days=1)  # Increment by one day
-
-    # Create the DataFrame
-    df = pd.DataFrame({"date": dates, "portfolio_value": portfolio_values})
-    df["date"] = pd.to_datetime(df["date"])  # Ensure 'date' column is datetime
-    df.set_index("date", inplace=True)
-    df.index = df.index.strftime("%Y-%m-%d")
-    return df
+    return Compute.run(tasks.dca_series, start_date, end_date, monthly_savings, allocations)
 
 
 @app.route("/user/<oauth_sub>/spy_portfolio", methods=["POST"])
@@ -339,22 +549,31 @@ def spy_portfolio(oauth_sub):
             404,
         )
 
-    allocations = {"SPY": 100}
+    ticker = req_json.get("ticker", "SPY")
 
     first_day = first_order.date
     today = datetime.now()
 
-    series = gen_timeseries_portfolio(first_day, today, monthly_savings, allocations)
+    try:
+        resolution = parse_resolution(request.args.get("resolution"))
+        series = Benchmarks.series(first_day, today, monthly_savings, ticker)
+    except ValueError as e:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": str(e)}),
+            400,
+        )
 
     # Remove rows that are 0
     series = series[series != 0]
 
     series = series.dropna(how="any")
+    series = downsample_frame(series, resolution, "portfolio_value")
 
-    port_val = json.loads(series.to_json())["portfolio_value"]
+    port_val = series_json(series["portfolio_value"])
     session.close()
 
-    return jsonify(
+    return json_response(
         {
             "status": 1,
             "data": {
@@ -362,3 +581,259 @@ def spy_portfolio(oauth_sub):
             },
         }
     )
+
+
+MAX_SCENARIOS = 256
+
+
+def start_date(session, user, start: str):
+    """
+    Finds the first day of a user's history.
+
+    Args:
+        session: The database session
+        user: The User
+        start: 'orders' for the first order date or 'transactions' for the
+            first transaction date
+
+    Returns:
+        The first date, or None if there is none.
+    """
+    first_day = None
+    if start == "transactions":
+        for account in user.accounts:
+            transactions = (
+                session.query(Transaction)
+                .filter(Transaction.account_id == account.id)
+                .all()
+            )
+            for transaction in transactions:
+                if first_day is None or transaction.date < first_day:
+                    first_day = transaction.date
+    elif user.portfolio:
+        for order in user.portfolio.orders:
+            if first_day is None or order.date < first_day:
+                first_day = order.date
+    return first_day
+
+
+@app.route("/user/<oauth_sub>/portfolio/scenarios", methods=["POST"])
+def portfolio_scenarios(oauth_sub):
+    """
+    Values many monthly savings amounts and allocations in one batch.
+
+    The body takes 'monthly_savings' (a number or a list), optional
+    'allocations' (a dict or a list of dicts, SPY by default) and an optional
+    'start' of 'orders' (the first order date, as /spy_portfolio) or
+    'transactions' (the first transaction date, as /portfolio/ai).
+    """
+    if not DB.connected:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Database not connected"}),
+            500,
+        )
+
+    session = DB.create_session()
+
+    located_user = session.query(User).filter(User.oauth_sub == oauth_sub).first()
+
+    if not located_user:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "User not found"}),
+            404,
+        )
+
+    req_json = request.get_json()
+
+    if any(key not in req_json for key in ["monthly_savings"]):
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Missing required fields"}),
+            400,
+        )
+
+    savings = req_json["monthly_savings"]
+    allocations = req_json.get("allocations", [{"SPY": 100}])
+    if not isinstance(savings, list):
+        savings = [savings]
+    if isinstance(allocations, dict):
+        allocations = [allocations]
+
+    try:
+        savings = [float(amount) for amount in savings]
+        allocations = [
+            {ticker: float(value) for ticker, value in allocation.items()}
+            for allocation in allocations
+        ]
+    except (AttributeError, TypeError, ValueError, OverflowError):
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Invalid scenarios"}),
+            400,
+        )
+
+    if len(savings) * len(allocations) > MAX_SCENARIOS:
+        return (
+            jsonify(
+                {
+                    "status": 0,
+                    "error": 1,
+                    "message": f"At most {MAX_SCENARIOS} scenarios per request",
+                }
+            ),
+            400,
+        )
+
+    first_day = start_date(session, located_user, req_json.get("start", "orders"))
+    session.close()
+
+    if first_day is None:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "No start date found"}),
+            404,
+        )
+
+    try:
+        calendar, values = Compute.run(
+            tasks.dca_scenarios, first_day, datetime.now(), savings, allocations
+        )
+    except ValueError as e:
+        return (
+            jsonify({"status": 0, "error": 1, "message": str(e)}),
+            400,
+        )
+    except ComputeBusy:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Server busy, try again shortly"}),
+            503,
+        )
+    except TimeoutError:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Computation timed out"}),
+            504,
+        )
+
+    scenarios = []
+    for a, allocation in enumerate(allocations):
+        for s, monthly_savings in enumerate(savings):
+            series = pd.Series(values[:, a, s], index=calendar)
+
+            # Remove rows that are 0
+            series = series[series != 0].dropna()
+
+            scenarios.append(
+                {
+                    "monthly_savings": monthly_savings,
+                    "allocations": allocation,
+                    "series": series_json(series),
+                }
+            )
+
+    return json_response({"status": 1, "error": 0, "data": {"scenarios": scenarios}})
+
+
+@app.route("/user/<oauth_sub>/portfolio/backtest", methods=["POST"])
+def portfolio_backtest(oauth_sub):
+    """
+    Backtests an allocation, such as the one /portfolio/ai suggests, with
+    periodic rebalancing.
+
+    The body takes 'allocations' (a dict of ticker to percentage), a
+    'monthly_savings' and/or 'initial' amount, an optional 'rebalance' of
+    'never', 'monthly' (the default), 'quarterly' or 'threshold' with its
+    'threshold' drift (0.05 by default), an optional 'cost_bps' per trade and
+    an optional 'start' of 'transactions' (the first transaction date, the
+    default), 'orders' (the first order date) or a date. Results are cached
+    by a hash of the allocations and parameters.
+    """
+    if not DB.connected:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Database not connected"}),
+            500,
+        )
+
+    session = DB.create_session()
+
+    located_user = session.query(User).filter(User.oauth_sub == oauth_sub).first()
+
+    if not located_user:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "User not found"}),
+            404,
+        )
+
+    req_json = request.get_json()
+
+    if any(key not in req_json for key in ["allocations"]):
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Missing required fields"}),
+            400,
+        )
+
+    try:
+        resolution = parse_resolution(request.args.get("resolution"))
+        allocations = {
+            ticker: float(value) for ticker, value in req_json["allocations"].items()
+        }
+        params = {
+            "monthly_savings": float(req_json.get("monthly_savings", 0)),
+            "initial": float(req_json.get("initial", 0)),
+            "rebalance": str(req_json.get("rebalance", "monthly")),
+            "threshold": float(req_json.get("threshold", 0.05)),
+            "cost_bps": float(req_json.get("cost_bps", 0)),
+        }
+        start = req_json.get("start", "transactions")
+        if start in ("orders", "transactions"):
+            first_day = start_date(session, located_user, start)
+        else:
+            first_day = parse(start).date()
+    except (AttributeError, TypeError, ValueError, OverflowError):
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Invalid backtest"}),
+            400,
+        )
+
+    session.close()
+
+    if first_day is None:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "No start date found"}),
+            404,
+        )
+
+    today = datetime.now().date()
+    key = Backtests.key(allocations, start=first_day, end=today, **params)
+    result = Backtests.get(key)
+    if result is None:
+        try:
+            result = Compute.run(tasks.backtest, allocations, first_day, today, params)
+        except ValueError as e:
+            return (
+                jsonify({"status": 0, "error": 1, "message": str(e)}),
+                400,
+            )
+        except ComputeBusy:
+            return (
+                jsonify({"status": 0, "error": 1, "message": "Server busy, try again shortly"}),
+                503,
+            )
+        except TimeoutError:
+            return (
+                jsonify({"status": 0, "error": 1, "message": "Computation timed out"}),
+                504,
+            )
+        Backtests.put(key, result)
+
+    series = downsample_frame(result["series"], resolution, "portfolio_value")
+
+    return json_response(
+        {
+            "status": 1,
+            "error": 0,
+            "data": {
+                **{name: value for name, value in result.items() if name != "series"},
+                "series": series_json(series["portfolio_value"]),
+            },
+        }
+    )
@@ -1,17 +1,18 @@
 import json
 import os
-from datetime import datetime, time
-from typing import Dict
+from datetime import datetime
 
-import pandas as pd
-from dateutil.relativedelta import relativedelta
 from flask import jsonify, request
 from google import genai
 from google.genai import types
 
 from database import DB
+from engine import ComputeBusy, downsample_frame, parse_resolution, series_json
 from models import Transaction, User
+from prices import Prices
+from server.api.user.portfolio import gen_timeseries_portfolio
 from server.app import api_router as app
+from server.app import json_response
 
 
 @app.route("/user/<oauth_sub>/ai-portfolio", methods=["GET"])
@@ -163,7 +164,21 @@ def generate_portfolio_content(user_preferences):
     """
 
     try:
-        return generate(prompt)
+        portfolio_data = generate(prompt)
+
+        # Drop tickers we have no price data for; the callers then adjust the
+        # largest remaining allocation so the total is back to 100%
+        unknown = [
+            key
+            for key in portfolio_data
+            if key != "reasoning" and not Prices.manifest.has(key)
+        ]
+        for ticker in unknown:
+            print(f"Dropping unknown ticker {ticker} from generated portfolio")
+            del portfolio_data[ticker]
+        if not any(key != "reasoning" for key in portfolio_data):
+            raise ValueError("Generated portfolio has no known tickers")
+        return portfolio_data
     except Exception as e:
         print(f"Error generating portfolio content: {e}")
         # Fallback to basic content with simplified format
@@ -185,85 +200,6 @@ def generate_portfolio_content(user_preferences):
         }
 
 
-def get_stock_price(ticker: str, date: str) -> float | None:
-    stock_df = pd.read_csv(os.path.join(os.getcwd(), "stockdata", f"{ticker}.csv"))
-
-    if date not in stock_df["Date"].values:
-        return None
-
-    return stock_df[stock_df["Date"] == date]["Close"].values[0]
-
-
-def gen_timeseries_portfolio(
-    start_date: datetime, end_date: datetime, monthly_savings: float, allocations: Dict
-) -> pd.DataFrame:
-    """
-    Generates a time series of daily portfolio value based on monthly investments and allocations.
-
-    Args:
-        start_date (datetime): The starting date of the investment period.
-        end_date (datetime): The ending date of the investment period.
-        monthly_savings (float): The amount to invest each month.
-        allocations (Dict): A dictionary mapping stock tickers to their allocation percentages (e.g., {"AAPL": 0.5, "MSFT": 0.5}).
-
-    Returns:
-        pd.DataFrame: A DataFrame with a 'date' column and a 'portfolio_value' column.  The 'portfolio_value'
-                       column contains the total value of the portfolio for each day in the specified period.
-    """
-
-    # Initialize data structures
-    portfolio = {
-        ticker: 0.0 for ticker in allocations
-    }  # Number of shares of each stock
-    portfolio_values = []
-    dates = []
-
-    stock_dfs = {}
-
-    # Fetch stock data
-    for ticker in allocations:
-        stock_df = pd.read_csv(os.path.join(os.getcwd(), "stockdata", f"{ticker}.csv"))
-        stock_dfs[ticker] = stock_df
-
-    def get_price(ticker, date):
-        if date not in stock_dfs[ticker]["Date"].values:
-            return None
-        return stock_dfs[ticker][stock_dfs[ticker]["Date"] == date]["Close"].values[0]
-
-    start = False
-    current_date = start_date
-    while datetime.combine(current_date, time.min) <= end_date:
-        date_str = current_date.strftime("%Y-%m-%d")
-
-        # Monthly investment
-        if current_date.day == 1 or start is False:
-            for ticker, allocation in allocations.items():
-                allocation /= 100
-                stock_price = get_price(ticker, date_str)
-                if stock_price is not None:  # Ensure it's a trading day
-                    shares_to_buy = (monthly_savings * allocation) / stock_price
-                    portfolio[ticker] += shares_to_buy
-                    start = True
-
-        # Calculate daily portfolio value
-        total_portfolio_value = 0.0
-        for ticker, num_shares in portfolio.items():
-            stock_price = get_price(ticker, date_str)
-            if stock_price is not None:  # Handle no trading day.
-                total_portfolio_value += num_shares * stock_price
-
-        portfolio_values.append(total_portfolio_value)
-        dates.append(current_date)
-        current_date += relativedelta(days=1)  # Increment by one day
-
-    # Create the DataFrame
-    df = pd.DataFrame({"date": dates, "portfolio_value": portfolio_values})
-    df["date"] = pd.to_datetime(df["date"])  # Ensure 'date' column is datetime
-    df.set_index("date", inplace=True)
-    df.index = df.index.strftime("%Y-%m-%d")
-    return df
-
-
 @app.route("/user/<oauth_sub>/portfolio/ai", methods=["POST"])
 def gen_timeseries(oauth_sub):
     if not DB.connected:
@@ -284,6 +220,14 @@ def gen_timeseries(oauth_sub):
 
     req_json = request.get_json()
 
+    try:
+        resolution = parse_resolution(request.args.get("resolution"))
+    except ValueError as e:
+        return (
+            jsonify({"status": 0, "error": 1, "message": str(e)}),
+            400,
+        )
+
     preferences = {
         "is_experienced_investor": located_user.is_experienced_investor,
         "preferred_sectors": located_user.preferred_sectors,
@@ -361,17 +305,31 @@ def gen_timeseries(oauth_sub):
     first_day = first_transaction.date
     today = datetime.now()
 
-    series = gen_timeseries_portfolio(first_day, today, monthly_savings, allocations)
+    try:
+        series = gen_timeseries_portfolio(first_day, today, monthly_savings, allocations)
+    except ComputeBusy:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Server busy, try again shortly"}),
+            503,
+        )
+    except TimeoutError:
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Computation timed out"}),
+            504,
+        )
 
     # Remove rows that are 0
     series = series[series != 0]
 
     series = series.dropna(how="any")
+    series = downsample_frame(series, resolution, "portfolio_value")
 
-    port_val = json.loads(series.to_json())["portfolio_value"]
+    port_val = series_json(series["portfolio_value"])
     session.close()
 
-    return jsonify(
+    return json_response(
         {
             "status": 1,
             "data": {
@@ -2,15 +2,18 @@ import base64
 import json
 import os
 
-from dateutil.parser import parse
+import pandas as pd
 from flask import jsonify, request
 from google import genai
 from google.genai import types
+from sqlalchemy import insert
 
 from database import DB
+from engine import parse_trades, read_trades_csv
 from models import Account, Order, OrderType, Portfolio, Transaction, User
 from nessie import Account as NessieAccount
 from nessie import AccountType, Customer, NessieClient
+from prices import Prices
 from server.app import api_router as app
 
 
@@ -115,6 +118,8 @@ def set_portfolio(oauth_sub):
     else:
         portfolio = located_user.portfolio
 
+    imported, rejects = 0, []
+
     if req_json["is_experienced_investor"] is True:
         located_user.has_trade_history = req_json["has_trade_history"]
 
@@ -122,23 +127,139 @@ def set_portfolio(oauth_sub):
         req_json["is_experienced_investor"] is True
         and req_json["has_trade_history"] is True
     ):
-        for order in req_json["trade_history_data"]:
-            new_order = Order(
-                date=parse(order["date"]),
-                type=OrderType(order["transaction_type"].upper()),
-                shares=float(order["quantity"]),
-                price_per_share=float(order["price"]),
-                ticker=order["symbol"],
-                portfolio=portfolio,
+        # Trades in unknown tickers, from before a ticker was listed or that
+        # do not parse are reported back instead of imported
+        try:
+            trades, rejects = parse_trades(
+                pd.DataFrame(req_json["trade_history_data"]), Prices.manifest
             )
-
-            session.add(new_order)
+        except ValueError as e:
+            session.close()
+            return (
+                jsonify({"status": 0, "error": 1, "message": str(e)}),
+                400,
+            )
+        imported = insert_trades(session, portfolio, trades)
 
     session.commit()
 
     session.close()
 
-    return jsonify({"status": 1, "error": 0, "message": "Portfolio updated"})
+    return jsonify(
+        {
+            "status": 1,
+            "error": 0,
+            "message": "Portfolio updated",
+            "data": report_trades(imported, rejects),
+        }
+    )
+
+
+# At most this many rejected rows are listed in a response
+MAX_REJECTS = 1000
+
+
+def report_trades(imported: int, rejects: list) -> dict:
+    return {
+        "imported": imported,
+        "rejected": len(rejects),
+        "rejects": rejects[:MAX_REJECTS],
+    }
+
+
+def insert_trades(session, portfolio, trades: pd.DataFrame) -> int:
+    """
+    Inserts parsed trades as orders of a portfolio with one multi-row INSERT.
+
+    Args:
+        session: The database session the portfolio was loaded with
+        portfolio: The Portfolio
+        trades: The accepted trades, as parse_trades returns them
+
+    Returns:
+        The number of orders inserted.
+    """
+    if trades.empty:
+        return 0
+    # A portfolio created in this session needs its id
+    session.flush()
+    rows = pd.DataFrame(
+        {
+            "date": trades["date"].dt.date,
+            "type": trades["type"].map(OrderType),
+            "shares": trades["shares"].astype(float),
+            "price_per_share": trades["price"].astype(float),
+            "ticker": trades["ticker"],
+        }
+    ).to_dict("records")
+    for row in rows:
+        row["portfolio_id"] = portfolio.id
+    session.execute(insert(Order), rows)
+    return len(rows)
+
+
+@app.route("/user/<oauth_sub>/portfolio/trades", methods=["POST"])
+def import_trades(oauth_sub):
+    """
+    Imports a trade history CSV into the user's portfolio.
+
+    The CSV is the request body, or its 'file' part in a multipart upload,
+    with a header naming the date, symbol, transaction_type, quantity and
+    price columns. It is parsed and inserted in chunks as it streams in, all
+    in one transaction, and rows that do not parse or check out against the
+    price data are reported by their index instead of failing the upload.
+    """
+    if not DB.connected:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "Database not connected"}),
+            500,
+        )
+
+    session = DB.create_session()
+
+    located_user = session.query(User).filter(User.oauth_sub == oauth_sub).first()
+
+    if not located_user:
+        return (
+            jsonify({"status": 0, "error": 1, "message": "User not found"}),
+            404,
+        )
+
+    portfolio = located_user.portfolio
+    if not portfolio:
+        portfolio = Portfolio(user=located_user)
+        session.add(portfolio)
+
+    upload = request.files.get("file")
+    stream = upload.stream if upload is not None else request.stream
+
+    imported, rejects, offset = 0, [], 0
+    try:
+        for chunk in read_trades_csv(stream):
+            trades, rejected = parse_trades(chunk, Prices.manifest, offset)
+            imported += insert_trades(session, portfolio, trades)
+            rejects += rejected
+            offset += len(chunk)
+    except ValueError as e:
+        session.rollback()
+        session.close()
+        return (
+            jsonify({"status": 0, "error": 1, "message": str(e)}),
+            400,
+        )
+
+    located_user.has_trade_history = located_user.has_trade_history or imported > 0
+    session.commit()
+    session.close()
+
+    return jsonify(
+        {
+            "status": 1,
+            "error": 0,
+            "message": "Trades imported",
+            "data": report_trades(imported, rejects),
+        }
+    )
 
 
 @app.route("/user/<oauth_sub>/portfolio/preferences", methods=["GET"])
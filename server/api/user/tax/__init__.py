@@ -7,9 +7,11 @@ from google import genai
 from google.genai import types
 
 from database import DB
+from engine import Compute, ComputeBusy, tasks
 from models import Account, Transaction, User
 from nessie import Account as NessieAccount
 from nessie import AccountType, Customer, NessieClient
+from server.api.user.portfolio import portfolio_orders_json
 from server.app import api_router as app
 
 
@@ -84,6 +86,16 @@ def tax_report(oauth_sub):
                 }
             )
 
+    # Realized gains per tax year and unrealized gains, from FIFO lots
+    capital_gains = None
+    if located_user.portfolio and located_user.portfolio.orders:
+        try:
+            capital_gains = Compute.run(
+                tasks.capital_gains, portfolio_orders_json(located_user.portfolio)
+            )
+        except (ValueError, ComputeBusy, TimeoutError) as e:
+            print(f"Could not compute capital gains: {e}")
+
     session.close()
 
     prompt = f"""
@@ -114,8 +126,14 @@ def tax_report(oauth_sub):
     }}
 
     {json.dumps(transactions_json)}
+
+    Here are the user's capital gains from stock sales per tax year, with FIFO cost basis:
+
+    {json.dumps(capital_gains["realized"] if capital_gains else {})}
     """
 
     response = generate(prompt)
+    if isinstance(response, dict):
+        response["CapitalGains"] = capital_gains
 
     return jsonify({"status": 1, "error": 0, "data": response}), 200
@@ -1,12 +1,29 @@
 from flask import Blueprint, Flask
 from flask_cors import CORS
 
+from engine.serialize import dumps
+
 app = Flask(__name__)
 CORS(app, origins="*")
 
 api_router = Blueprint("api", __name__, url_prefix="/api", cli_group=None)
 
+
+def json_response(payload, status: int = 200):
+    """
+    Returns the same response as jsonify, with any RawJSON series embedded as is.
+
+    Args:
+        payload: The response body, which may contain RawJSON values
+        status: The HTTP status code
+    """
+    return app.response_class(
+        f"{dumps(payload)}\n", status=status, mimetype="application/json"
+    )
+
+
 import server.api.account
+import server.api.health
 import server.api.test
 import server.api.user
 import server.api.user.accounts